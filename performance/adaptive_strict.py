@@ -0,0 +1,140 @@
+import pprint
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from benchmark import measure, print_header, print_results
+
+# parsing_strict_mode.py shows lax mode coercing "123" -> int and 12.35 -> Decimal, while strict mode rejects
+# those inputs. The idea was to validate strictly first and fall back to lax mode only when that fails, but
+# pydantic-core's lax validators already check for the exact type first and only try a coercion for a value
+# that does not have it - the strict fast path with a per-value lax fallback, inside one call.
+# Measured on well-typed records (see the benchmark), strict validation is not faster than lax, and
+# strict-then-lax validates every record that needs a coercion twice.
+#
+# AdaptiveValidator therefore validates in lax mode, which runs at strict speed for well-typed data, and
+# tracks the per-field fallback rates on a sample: every `sample_every`-th record is also checked
+# strictly, and the fields that fail that check are the ones the feed needs coercion for.
+#
+#     validator = AdaptiveValidator(MyModel)
+#     my_model = validator.validate({"my_int": "123", "my_str": "abc"})  # coerced, as in lax mode
+#     validator.stats.field_fallback_rates()  # {'my_int': 1.0}
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@dataclass
+class AdaptiveStats:
+    validated: int = 0
+    sampled: int = 0  # records also checked strictly
+    fallbacks: int = 0  # sampled records that are only valid in lax mode
+    field_fallbacks: Counter = field(default_factory=Counter)  # field -> sampled records it needed lax in
+
+    @property
+    def fallback_rate(self) -> float:
+        return self.fallbacks / self.sampled if self.sampled else 0.0
+
+    def field_fallback_rates(self) -> dict[str, float]:
+        if not self.sampled:
+            return {}
+        return {name: count / self.sampled for name, count in self.field_fallbacks.most_common()}
+
+
+class AdaptiveValidator(Generic[ModelT]):
+    """Validate in lax mode and sample how often the fields needed it."""
+
+    def __init__(self, model: type[ModelT], *, sample_every: int = 100):
+        self.model = model
+        self.sample_every = sample_every
+        self.stats = AdaptiveStats()
+
+    def validate(self, data: Any) -> ModelT:
+        return self._validate(data, json=False)
+
+    def validate_json(self, data: str | bytes) -> ModelT:
+        return self._validate(data, json=True)
+
+    def _validate(self, data: Any, json: bool) -> ModelT:
+        validator = self.model.__pydantic_validator__
+        validate = validator.validate_json if json else validator.validate_python
+        result = validate(data)  # invalid records raise their lax errors
+        self.stats.validated += 1
+        if self.stats.validated % self.sample_every == 0:
+            self._sample(validate, data)
+        return result
+
+    def _sample(self, validate: Any, data: Any) -> None:
+        self.stats.sampled += 1
+        try:
+            validate(data, strict=True)
+        except ValidationError as e:
+            self.stats.fallbacks += 1
+            self.stats.field_fallbacks.update({str(details["loc"][0]) if details["loc"] else "" for details in e.errors()})
+
+
+if __name__ == "__main__":
+    import random
+
+    print("--- Adaptive strict validation ---")
+
+    class MyModel(BaseModel):
+        my_int: int
+        my_str: str
+        my_number: Decimal
+
+    validator = AdaptiveValidator(MyModel, sample_every=1)
+    print(validator.validate({"my_int": 123, "my_str": "abc", "my_number": Decimal("12.35")}))
+    print(validator.validate({"my_int": "123", "my_str": "abc", "my_number": 12.35}))  # coerced
+    try:
+        validator.validate({"my_int": "abc", "my_str": "abc", "my_number": 12.35})
+    except ValidationError as e:
+        print(e.errors())  # Input should be a valid integer, unable to parse string as an integer
+    print(validator.stats)  # validated=2 sampled=2 fallbacks=1 ...
+    pprint.pp(validator.stats.field_fallback_rates())  # {'my_int': 0.5, 'my_number': 0.5}
+
+    print("\n--- Benchmark ---")
+
+    class MyWideModel(BaseModel):
+        my_int_0: int
+        my_int_1: int
+        my_int_2: int
+        my_float_0: float
+        my_float_1: float
+        my_str_0: str
+        my_str_1: str
+        my_bool: bool
+        my_list: list[int]
+        my_decimal: Decimal
+
+    def record(i: int, messy: bool) -> dict[str, Any]:
+        if messy:
+            return {
+                "my_int_0": str(i), "my_int_1": str(i), "my_int_2": str(i), "my_float_0": str(i), "my_float_1": str(i),
+                "my_str_0": "abc", "my_str_1": "def", "my_bool": "true", "my_list": [str(i)], "my_decimal": str(i),
+            }
+        return {
+            "my_int_0": i, "my_int_1": i, "my_int_2": i, "my_float_0": 1.5, "my_float_1": 2.5,
+            "my_str_0": "abc", "my_str_1": "def", "my_bool": True, "my_list": [i], "my_decimal": Decimal(i),
+        }
+
+    feeds = {
+        "well-typed": [record(i, False) for i in range(1_000)],
+        "5% messy": [record(i, random.random() < 0.05) for i in range(1_000)],
+        "all messy": [record(i, True) for i in range(1_000)],
+    }
+    def strict_then_lax(data: dict[str, Any]) -> MyWideModel:
+        try:
+            return MyWideModel.model_validate(data, strict=True)
+        except ValidationError:
+            return MyWideModel.model_validate(data)
+
+    print_header()
+    results = [measure("strict, well-typed", lambda data: MyWideModel.model_validate(data, strict=True), feeds["well-typed"])]
+    for label, feed in feeds.items():
+        results.append(measure(f"lax, {label}", MyWideModel.model_validate, feed))
+        results.append(measure(f"strict then lax, {label}", strict_then_lax, feed))
+        results.append(measure(f"AdaptiveValidator, {label}", AdaptiveValidator(MyWideModel).validate, feed))
+    print_results(results)
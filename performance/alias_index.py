@@ -0,0 +1,93 @@
+from functools import lru_cache
+from typing import Callable
+
+from pydantic import BaseModel, ConfigDict, create_model
+from pydantic.alias_generators import to_camel
+
+from benchmark import measure, print_header, print_results
+
+# config.py uses alias_generator=to_camel and an upper-casing lambda. Pydantic calls the generator for every
+# field of every model at class creation, and with thousands of camel-cased models the same field names
+# are converted again and again. cached_alias_generator memoizes a generator in a bounded lru_cache, shared by
+# every model configured with the returned function. This is not a class-creation speedup: the generator is
+# about 3% of a class creation (0.26s of 8.8s in the benchmark below), schema generation is the rest -
+# see schema_cache.py and lazy_models.py for that.
+#
+#     to_camel_cached = cached_alias_generator(to_camel)
+#
+#     class MyModel(BaseModel):
+#         model_config = ConfigDict(alias_generator=to_camel_cached, populate_by_name=True)
+#
+# With populate_by_name=True pydantic-core looks every field up by its alias first and by its name second,
+# so a payload spelled with field names pays a failed lookup per field. A per-model index from both spellings
+# to the field name does not win that back: the index lives in Python, and re-keying a 250 field payload
+# through it costs more than the second lookups pydantic-core does in Rust (see the benchmark below -
+# re-keyed payloads validate slower than either spelling validates directly). A second validator without the
+# aliases only helps payloads spelled entirely by name, needs a full scan of the keys to find those, and has
+# to run the model's own validator again to report errors with the model's locations. So there is no alias
+# index here: model_validate already resolves either spelling, and the saving this module keeps is the alias
+# table shared across models.
+
+ALIAS_CACHE_SIZE = 4_096
+
+
+def cached_alias_generator(generator: Callable[[str], str], maxsize: int = ALIAS_CACHE_SIZE) -> Callable[[str], str]:
+    """Memoize an alias generator, share the returned function between models to share its cache."""
+    return lru_cache(maxsize=maxsize)(generator)
+
+
+to_camel_cached = cached_alias_generator(to_camel)
+
+
+if __name__ == "__main__":
+    import time
+
+    print("--- Shared alias table ---")
+
+    class MyModel(BaseModel):
+        model_config = ConfigDict(alias_generator=to_camel_cached, populate_by_name=True)
+
+        my_int: int
+        my_str: str
+
+    print(to_camel_cached.cache_info())  # CacheInfo(hits=0, misses=2, maxsize=4096, currsize=2)
+    print(MyModel.model_validate({"myInt": 123, "my_str": "abc"}))  # my_int=123 my_str='abc'
+
+    print("\n--- Benchmark: validation of 250 field payloads ---")
+    vocabulary = [f"field_number_{i}" for i in range(1_000)]
+    MyWideModel = create_model(
+        "MyWideModel",
+        __config__=ConfigDict(alias_generator=to_camel_cached, populate_by_name=True),
+        **{name: (int, ...) for name in vocabulary[:250]},
+    )
+    by_alias = [{to_camel(name): i for name in vocabulary[:250]} for i in range(100)]
+    by_name = [{name: i for name in vocabulary[:250]} for i in range(100)]
+    # what an index in Python would do first: resolve either spelling to one key with a single dict lookup
+    index = {key: to_camel(name) for name in vocabulary[:250] for key in (name, to_camel(name))}
+
+    def validate_indexed(data: dict) -> BaseModel:
+        return MyWideModel.model_validate({index[key]: value for key, value in data.items()})
+
+    print_header()
+    print_results([
+        measure("model_validate, aliases", MyWideModel.model_validate, by_alias),
+        measure("model_validate, names", MyWideModel.model_validate, by_name),
+        measure("index, then model_validate, names", validate_indexed, by_name),
+    ])
+
+    print("\n--- Benchmark: class creation ---")
+    # 200 models of 200 fields each, drawn from a shared vocabulary of field names
+    models_fields = [
+        {name: (int, 0) for name in vocabulary[start:start + 200]} for start in range(0, 1_000, 4)
+    ][:200]
+    for label, generator in [("to_camel", to_camel), ("to_camel_cached", to_camel_cached)]:
+        config = ConfigDict(alias_generator=generator, populate_by_name=True)
+        start = time.perf_counter()
+        for fields in models_fields:
+            create_model("MyWideModel", __config__=config, **fields)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        for fields in models_fields:
+            for name in fields:
+                generator(name)
+        print(f"{label:<16} {elapsed:.3f}s for 200 models, {time.perf_counter() - start:.4f}s of it in the generator")
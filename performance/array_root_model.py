@@ -0,0 +1,330 @@
+import sys
+import warnings
+from array import array
+from typing import Annotated, Any, Iterator
+
+from pydantic import GetCoreSchemaHandler, RootModel, ValidationError
+from pydantic_core import core_schema, from_json
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, to_numpy() and the JSON fast paths need it
+    np = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, it writes the JSON of numpy arrays straight from their buffer
+    orjson = None
+
+# RootModel[list[int]] in models/root_model.py keeps a Python list of int objects: with 10**6 readings that is
+# 8 bytes of pointer plus a 28 byte int per reading. ArrayRootModel validates straight into an array.array,
+# 8 bytes per reading in one buffer:
+#
+#     class MyReadings(ArrayRootModel):
+#         root: Int64Array
+#
+#     my_readings = MyReadings.model_validate_json(b"[1, 2, 3]")
+#     my_readings[0], len(my_readings), list(my_readings)
+#     memoryview(my_readings.root)  # buffer protocol, no copy
+#     my_readings.to_numpy()  # a numpy view on the same buffer
+#
+# A list of ints (or floats for Float64Array) is copied into the array in C. An array with the right typecode
+# is taken as it is, without a copy, and a memoryview (or another buffer such as a numpy array, wrapped in one)
+# is copied in one memcpy when its format is the same kind of number with the same size in native byte order,
+# e.g. numpy's int64 "l" for "q" - any other format is rejected, never reinterpreted. Raw bytes and bytearrays
+# carry no format, they are only taken with TypedArray(typecode, raw_bytes=True).
+# Values that need lax coercion ("1", 1.0, True) go through pydantic's list[int] validation first, so the errors
+# and their locations are pydantic's own. In strict mode every list goes through it, array() alone would take
+# True and False as ints.
+#
+# With numpy installed, JSON never passes through Python numbers:
+# - model_validate_json reads a flat array of plain JSON numbers with numpy.fromstring straight into the buffer.
+#   The bytes are checked against the JSON number grammar first, so anything else (strings, nested values,
+#   leading zeros, values that do not fit the typecode) takes the from_json path with pydantic's own errors.
+# - model_dump_json writes the JSON from the buffer: with orjson installed through its numpy support (ints and
+#   floats, the same text pydantic writes, about 3x faster than dumping a list), otherwise for integer arrays
+#   with numpy, 4 digits at a time from a lookup table - no int objects, but about 2x slower than dumping a
+#   list, numpy needs several passes over the buffer. Without either, for floats without orjson, and for
+#   ArrayRootModels nested in another model, the serializer goes through array.tolist() and builds a Python
+#   number per element.
+# Iterating, indexing and sum() build a Python number per element and are slower than on a list; use
+# to_numpy() for reductions over the whole buffer.
+
+INT_TYPECODES = "bBhHiIlLqQ"
+FORMAT_KINDS = {**dict.fromkeys("bhilqn", "signed"), **dict.fromkeys("BHILQN", "unsigned"), **dict.fromkeys("fd", "float")}
+NATIVE_ORDER = ("@", "=", "<" if sys.byteorder == "little" else ">")
+
+# the bytes _read_json_numbers lets through to numpy, anything else takes the from_json path
+JSON_SPACE = b" \t\r\n"
+DIGITS = b"0123456789"
+INT_BYTES = DIGITS + JSON_SPACE + b",-"
+FLOAT_BYTES = INT_BYTES + b"+.eE"
+if np is not None:
+    EXPONENT = np.frombuffer(b"eE", np.uint8)
+    EXPONENT_NEXT = np.frombuffer(DIGITS + b"+-", np.uint8)
+    FRACTION_OR_EXPONENT = np.frombuffer(b".eE+", np.uint8)
+    # b"0000", b"0001", ... b"9999" as native uint32 words, the digits written by _dump_json_ints
+    DIGIT_WORDS = np.frombuffer(b"".join(b"%04d" % i for i in range(10_000)), np.uint32)
+    POWERS_OF_TEN = np.array([10**k for k in range(1, 19)])
+
+
+def _buffer_matches(view: memoryview, typecode: str) -> bool:
+    # the same kind of number, the same item size and native byte order
+    buffer_format = view.format
+    if buffer_format[:1] in NATIVE_ORDER:
+        buffer_format = buffer_format[1:]
+    return (
+        FORMAT_KINDS.get(buffer_format, buffer_format) == FORMAT_KINDS[typecode]
+        and view.itemsize == array(typecode).itemsize
+    )
+
+
+class TypedArray:
+    """Annotated marker that validates a list of numbers into an array.array with the given typecode.
+
+    raw_bytes=True also takes bytes and bytearray inputs as the machine representation of the items.
+    """
+
+    def __init__(self, typecode: str, *, raw_bytes: bool = False):
+        self.typecode = typecode
+        self.raw_bytes = raw_bytes
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        typecode = self.typecode
+        raw_bytes = self.raw_bytes
+        item_schema = core_schema.int_schema() if typecode in INT_TYPECODES else core_schema.float_schema()
+
+        def from_buffer(value: Any) -> array | None:
+            if isinstance(value, memoryview):
+                if not (_buffer_matches(value, typecode) or raw_bytes and value.format in ("B", "b", "c")):
+                    raise ValueError(f"buffer format {value.format!r} does not match array typecode {typecode!r}")
+            elif not (raw_bytes and isinstance(value, (bytes, bytearray))):
+                return None
+            view = memoryview(value)
+            result = array(typecode)
+            # a ValueError if the length is not a multiple of the item size
+            result.frombytes(view.cast("B") if view.c_contiguous else view.tobytes())
+            return result
+
+        def validate(value: Any, handler: core_schema.ValidatorFunctionWrapHandler, fast_lists: bool) -> array:
+            if type(value) is array and value.typecode == typecode:
+                return value
+            result = from_buffer(value)
+            if result is not None:
+                return result
+            if fast_lists and type(value) is list:
+                try:
+                    return array(typecode, value)
+                except (TypeError, OverflowError):
+                    pass
+            try:
+                return array(typecode, handler(value))
+            except OverflowError as e:
+                raise ValueError(f"{e} for array typecode {typecode!r}") from e
+
+        list_schema = core_schema.list_schema(item_schema)
+        return core_schema.lax_or_strict_schema(
+            lax_schema=core_schema.no_info_wrap_validator_function(
+                lambda value, handler: validate(value, handler, True), list_schema
+            ),
+            strict_schema=core_schema.no_info_wrap_validator_function(
+                lambda value, handler: validate(value, handler, False), list_schema
+            ),
+            serialization=core_schema.plain_serializer_function_ser_schema(array.tolist),
+        )
+
+
+Int64Array = Annotated[array, TypedArray("q")]
+Float64Array = Annotated[array, TypedArray("d")]
+
+
+class ArrayRootModel(RootModel[Int64Array]):
+    def __iter__(self) -> Iterator[int | float]:
+        return iter(self.root)
+
+    def __getitem__(self, item: int | slice) -> Any:
+        return self.root[item]
+
+    def __len__(self) -> int:
+        return len(self.root)
+
+    def to_numpy(self) -> Any:
+        if np is None:
+            raise ImportError("to_numpy() needs numpy: pip install numpy")
+        return np.frombuffer(self.root, dtype=self.root.typecode)
+
+    def model_dump_json(self, *, indent: int | None = None, include: Any = None, exclude: Any = None, **kwargs: Any) -> str:
+        if indent is None and include is None and exclude is None and np is not None:
+            text = _dump_json_buffer(self.root, self.model_config.get("ser_json_inf_nan", "null"))
+            if text is not None:
+                return text.decode()
+        return super().model_dump_json(indent=indent, include=include, exclude=exclude, **kwargs)
+
+    @classmethod
+    def model_validate_json(cls, json_data: str | bytes | bytearray, **kwargs: Any) -> Any:
+        typecode = next(item.typecode for item in cls.model_fields["root"].metadata if isinstance(item, TypedArray))
+        if np is not None:
+            result = _read_json_numbers(json_data, typecode)
+            if result is not None:
+                return cls.model_validate(result, **kwargs)
+        # a Python validator function on JSON input gets the array converted from pydantic's JSON values,
+        # parsing it with from_json and validating the resulting list is faster
+        try:
+            data = from_json(json_data)
+        except ValueError as e:
+            raise ValidationError.from_exception_data(
+                cls.__name__, [{"type": "json_invalid", "loc": (), "input": json_data, "ctx": {"error": str(e)}}]
+            ) from None
+        return cls.model_validate(data, **kwargs)
+
+
+def _read_json_numbers(json_data: str | bytes | bytearray, typecode: str) -> array | None:
+    # a flat JSON array of plain numbers parsed by numpy, None for anything that needs pydantic's JSON parser
+    data = (json_data.encode() if isinstance(json_data, str) else bytes(json_data)).strip(JSON_SPACE)
+    if data[:1] != b"[" or data[-1:] != b"]":
+        return None
+    inner = data[1:-1]
+    is_int = typecode in INT_TYPECODES
+    if inner.translate(None, INT_BYTES if is_int else FLOAT_BYTES):
+        return None  # strings, nested values, true/false/null, NaN...
+    # numbers and commas take turns, starting and ending with a number
+    compact = inner.translate(None, JSON_SPACE)
+    if not compact:
+        return array(typecode)
+    if compact[:1] not in DIGITS + b"-" or compact[-1:] not in DIGITS or b",," in compact:
+        return None
+    # numpy also takes "- 1", "01", ".5" and "1." - in JSON a sign or dot is followed by a digit, a dot and an
+    # exponent follow a digit, a plus sign follows an exponent, and no number starts with 0 and another digit
+    raw = np.frombuffer(inner, np.uint8)
+    digit = (raw - ord("0")) < 10
+    before, after = raw[:-1], digit[1:]
+    # a 0 starts a number when the byte before it is not a digit, or for floats a dot or part of an exponent,
+    # where leading zeros are fine
+    previous = np.r_[0, raw][: len(before)]
+    inside = np.r_[False, digit][: len(before)]
+    if not is_int:
+        exponent_sign = (previous == ord("-")) & np.isin(np.r_[0, 0, raw][: len(before)], EXPONENT)
+        inside |= np.isin(previous, FRACTION_OR_EXPONENT) | exponent_sign
+    if not after[before == ord("-")].all() or (after & ~inside & (before == ord("0"))).any():
+        return None
+    if not is_int:
+        following = raw[1:]
+        if (
+            not after[(before == ord(".")) | (before == ord("+"))].all()
+            or not digit[:-1][(following == ord(".")) | (following == ord("e")) | (following == ord("E"))].all()
+            or not np.isin(following[(before == ord("e")) | (before == ord("E"))], EXPONENT_NEXT).all()
+            or not np.isin(before[following == ord("+")], EXPONENT).all()
+        ):
+            return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # numpy only warns when it stops before the end of the text
+        try:
+            values = np.fromstring(inner, dtype=np.int64 if is_int else np.float64, sep=",")
+        except (ValueError, DeprecationWarning):
+            return None  # e.g. whitespace inside a number, or two numbers without a comma
+    if len(values) != compact.count(b",") + 1:
+        return None
+    if is_int:
+        # numbers with 19 digits may have been clamped to the int64 range, pydantic's path checks them exactly,
+        # as it does values that do not fit the typecode
+        limits = np.iinfo(typecode)
+        if values.min() < max(limits.min, 1 - 10**18) or values.max() > min(limits.max, 10**18 - 1):
+            return None
+    elif not np.isfinite(values).all():
+        return None  # overflow to inf
+    result = array(typecode)
+    result.frombytes(values.astype(typecode, copy=False).tobytes())
+    return result
+
+
+def _dump_json_buffer(values: array, inf_nan: str) -> bytes | None:
+    # the JSON text of the array written from its buffer, None when only pydantic's serializer can write it
+    numbers = np.frombuffer(values, values.typecode)
+    is_int = values.typecode in INT_TYPECODES
+    if orjson is not None and (is_int or inf_nan == "null"):  # orjson writes NaN and inf as null
+        # pydantic writes float32 values as the float64 they convert to
+        return orjson.dumps(numbers if values.typecode != "f" else numbers.astype(np.float64), option=orjson.OPT_SERIALIZE_NUMPY)
+    return _dump_json_ints(numbers) if is_int else None
+
+
+def _dump_json_ints(numbers: "np.ndarray") -> bytes | None:
+    # numpy's own JSON writer for integers, None for values the int64 digits cannot hold
+    if not len(numbers):
+        return b"[]"
+    if numbers.min() <= -(2**63) or numbers.max() >= 2**63:
+        return None
+    numbers = numbers.astype(np.int64, copy=False)
+    negative = numbers < 0
+    magnitudes = np.abs(numbers)
+    words = -(-len(str(int(magnitudes.max()))) // 4)
+    # one row of uint32 words per number: a word for the sign, the digits 4 to a word, then a word with the comma
+    rows = np.empty((len(numbers), words + 2), np.uint32)
+    rest = magnitudes
+    for column in range(words, 0, -1):
+        rest, digits = np.divmod(rest, 10_000)
+        rows[:, column] = DIGIT_WORDS[digits]
+    row_bytes = rows.view(np.uint8)
+    width = row_bytes.shape[1]
+    row_bytes[:, width - 4] = ord(",")
+    # the first byte to keep is the sign or the first digit that is not a leading zero
+    first = (width - 5) - np.searchsorted(POWERS_OF_TEN, magnitudes, side="right") - negative
+    row_bytes[np.flatnonzero(negative), first[negative]] = ord("-")
+    columns = np.arange(width)
+    keep = (columns >= columns[:, None]) & (columns <= width - 4)
+    text = row_bytes[keep[first]]
+    text[-1] = ord("]")
+    return b"[" + text.tobytes()
+
+
+if __name__ == "__main__":
+    import pprint
+    import timeit
+
+    print("--- Array-backed RootModel ---")
+
+    class MyReadings(ArrayRootModel):
+        root: Int64Array
+
+    my_readings = MyReadings([1, 2, 3])
+    print(my_readings)  # root=array('q', [1, 2, 3])
+    print(my_readings[0], len(my_readings), list(my_readings))  # 1 3 [1, 2, 3]
+    print(MyReadings(["4", 5.0]).root)  # array('q', [4, 5]), lax coercion
+    print(my_readings.model_dump_json())  # [1,2,3]
+    print(memoryview(my_readings.root).nbytes)  # 24
+    print(MyReadings(memoryview(my_readings.root)).root)  # array('q', [1, 2, 3])
+
+    try:
+        MyReadings([1, "hello", 3])
+    except ValidationError as e:
+        pprint.pp(e.errors())  # Input should be a valid integer, loc (1,)
+
+    class MyFloatReadings(ArrayRootModel):
+        root: Float64Array
+
+    print(MyFloatReadings.model_validate_json("[1.5, 2, 3.25]").root)  # array('d', [1.5, 2.0, 3.25])
+
+    print("\n--- Benchmark: 10**6 readings ---")
+    MyListReadings = RootModel[list[int]]
+    readings = list(range(1_000_000))
+    json_data = MyListReadings(readings).model_dump_json()
+    list_readings = MyListReadings(readings)
+    array_readings = MyReadings(readings)
+
+    def ms(func: Any) -> float:
+        return min(timeit.repeat(func, number=3, repeat=3)) / 3 * 1_000
+
+    print(f"{'case':<44} {'RootModel[list[int]]':>22} {'ArrayRootModel':>16}")
+    print(f"{'validate list, ms':<44} {ms(lambda: MyListReadings(readings)):>22.1f} {ms(lambda: MyReadings(readings)):>16.1f}")
+    print(
+        f"{'model_validate_json, ms':<44} {ms(lambda: MyListReadings.model_validate_json(json_data)):>22.1f} "
+        f"{ms(lambda: MyReadings.model_validate_json(json_data)):>16.1f}"
+    )
+    print(f"{'model_dump_json, ms':<44} {ms(list_readings.model_dump_json):>22.1f} {ms(array_readings.model_dump_json):>16.1f}")
+    if np is not None:
+        numpy_dump = ms(lambda: _dump_json_ints(array_readings.to_numpy()))
+        print(f"{'model_dump_json without orjson, ms':<44} {'':>22} {numpy_dump:>16.1f}")
+    print(f"{'sum, ms':<44} {ms(lambda: sum(list_readings.root)):>22.1f} {ms(lambda: sum(array_readings)):>16.1f}")
+    list_bytes = sys.getsizeof(readings) + sum(map(sys.getsizeof, readings))
+    print(f"{'memory, MB':<44} {list_bytes / 1e6:>22.1f} {sys.getsizeof(array_readings.root) / 1e6:>16.1f}")
+    if np is not None:
+        print(f"{'numpy sum, ms':<44} {'':>22} {ms(lambda: array_readings.to_numpy().sum()):>16.1f}")
@@ -0,0 +1,161 @@
+import pprint
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Annotated, Any, Generic, Sequence, TypeVar, Union
+
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, Json, TypeAdapter, ValidationError
+from pydantic_core import CoreSchema, ErrorDetails, core_schema, to_json
+
+from batch_defaults import fill_batch_defaults
+
+# Validating a list of records one by one with try/except around every record is slow:
+# every record is a separate trip into pydantic-core and every failure builds a ValidationError.
+# Instead the whole batch is validated in a single core call, as a list of Model | FailedRecord:
+# a record that is not a valid Model is kept as it was instead of failing the whole list, so every valid
+# record is validated exactly once - model validators included - and its instance comes out of that call.
+# Only the failing records are then validated again, together as a list[Model] in a second call, to get
+# their errors, e.g. {3: [{'loc': ('my_int',), ...}]}. In a JSON batch FailedRecord keeps the parsed value of
+# the record, and the failing ones are encoded to JSON again with to_json and validated in JSON mode, so the
+# cost of a bad record does not depend on the size of the batch.
+# A clean batch therefore costs one core call and a batch with bad records costs two.
+# batch_validate_lines does the same for a list of JSON documents, each parsed and validated on its own.
+# Fields with a BatchDefaultFactory (batch_defaults.py) get their defaults for the whole batch in one call.
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@dataclass
+class BatchResult(Generic[ModelT]):
+    valid: list[ModelT] = field(default_factory=list)  # valid instances in input order
+    valid_indices: list[int] = field(default_factory=list)  # position of each valid instance in the input
+    errors: dict[int, list[ErrorDetails]] = field(default_factory=dict)  # input position -> errors
+
+
+class FailedRecord:
+    # stands in for a record that is not a valid model in the first pass, holding its input as it was
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> CoreSchema:
+        return core_schema.no_info_plain_validator_function(cls)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+@lru_cache(maxsize=None)
+def partial_list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    # left_to_right: the model is tried once, in the mode of the call, before the record is given up on
+    return TypeAdapter(list[Annotated[Union[model, FailedRecord], Field(union_mode="left_to_right")]])
+
+
+def group_errors(error: ValidationError) -> dict[int, list[ErrorDetails]]:
+    # the first element of every loc is the index of the record in the list,
+    # an error without a loc means the batch itself is not a list and is re-raised
+    errors: dict[int, list[ErrorDetails]] = {}
+    for details in error.errors():
+        if not details["loc"]:
+            raise error
+        index, *loc = details["loc"]
+        details["loc"] = tuple(loc)
+        errors.setdefault(index, []).append(details)
+    return errors
+
+
+def batch_validate(model: type[ModelT], records: Sequence[dict[str, Any]] | bytes) -> BatchResult[ModelT]:
+    """Validate a sequence of dicts, or a JSON array as bytes, with at most two core calls."""
+    if isinstance(records, (bytes, bytearray, str)):
+        return _validate_json(model, records)
+
+    records, filled = fill_batch_defaults(model, records)
+    result = _validate_python(model, records)
+    if filled:
+        unset_filled_defaults(result, filled)
+    return result
+
+
+def batch_validate_lines(model: type[ModelT], lines: Sequence[bytes | str]) -> BatchResult[ModelT]:
+    """Validate a sequence of JSON documents holding one record each, e.g. NDJSON lines, with at most two core calls."""
+    # Json[model] parses every line on its own, a line that is not exactly one JSON value fails as json_invalid
+    return _validate_python(Json[model], lines)
+
+
+def _split(models: list[Any]) -> tuple[BatchResult, list[int]]:
+    # the valid instances of the first pass, and the positions of the records that failed it
+    result, failed = BatchResult(), []
+    for index, model in enumerate(models):
+        if type(model) is FailedRecord:
+            failed.append(index)
+        else:
+            result.valid.append(model)
+            result.valid_indices.append(index)
+    return result, failed
+
+
+def _failed_errors(failed: list[int], error: ValidationError) -> dict[int, list[ErrorDetails]]:
+    # the errors of the re-validated records, at the positions the records have in the batch
+    return {failed[position]: errors for position, errors in group_errors(error).items()}
+
+
+def _validate_python(model: type[BaseModel], records: Sequence[dict[str, Any]]) -> BatchResult:
+    result, failed = _split(partial_list_adapter(model).validate_python(records))
+    if failed:
+        try:
+            list_adapter(model).validate_python([records[index] for index in failed])
+        except ValidationError as e:
+            result.errors = _failed_errors(failed, e)
+    return result
+
+
+def _validate_json(model: type[BaseModel], records: str | bytes | bytearray) -> BatchResult:
+    models = partial_list_adapter(model).validate_json(records)
+    result, failed = _split(models)
+    if failed:
+        try:
+            # the parsed values of the failing records only, encoded again so they are validated in JSON mode
+            list_adapter(model).validate_json(to_json([models[index].value for index in failed]))
+        except ValidationError as e:
+            result.errors = _failed_errors(failed, e)
+    return result
+
+
+def unset_filled_defaults(result: BatchResult, filled: dict[str, list[int]]) -> None:
+    # a default stays a default: filled fields must not show up in model_fields_set / exclude_unset
+    positions = {index: position for position, index in enumerate(result.valid_indices)}
+    for name, indices in filled.items():
+        for index in indices:
+            position = positions.get(index)
+            if position is not None:
+                result.valid[position].__pydantic_fields_set__.discard(name)
+
+if __name__ == "__main__":
+
+    print("--- Batch validation ---")
+
+    class MyModel(BaseModel):
+        my_int: int
+        my_str: str
+
+    class TopModel(BaseModel):
+        my_model: MyModel
+
+    records = [
+        {"my_int": 123, "my_str": "bar"},
+        {"my_int": "abs", "my_str": 123},
+        {"my_int": "456", "my_str": "baz"},
+    ]
+    result = batch_validate(MyModel, records)
+    print(result.valid)  # [MyModel(my_int=123, my_str='bar'), MyModel(my_int=456, my_str='baz')]
+    print(result.valid_indices)  # [0, 2]
+    pprint.pp(result.errors)  # {1: [{'type': 'int_parsing', 'loc': ('my_int',), ...}, {'type': 'string_type', ...}]}
+
+    print("\n--- Batch validation from JSON ---")
+    json_data = b'[{"my_model": {"my_int": 1, "my_str": "a"}}, {"my_model": {"my_int": "x", "my_str": "b"}}]'
+    result = batch_validate(TopModel, json_data)
+    print(result.valid)  # [TopModel(my_model=MyModel(my_int=1, my_str='a'))]
+    pprint.pp(result.errors)  # {1: [{'type': 'int_parsing', 'loc': ('my_model', 'my_int'), ...}]}
@@ -0,0 +1,147 @@
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+# Shared helpers for the benchmarks in this folder.
+# Every benchmark script describes its cases as (name, func, payloads) tuples and hands them to
+# benchmark_main, which measures them, prints a table and compares the run against a saved baseline.
+
+DEFAULT_SIZES = (1, 1_000, 1_000_000)
+MIN_OPS = 100_000  # small payload lists are repeated until at least this many calls were timed
+ALLOCATION_SAMPLE = 1_000  # tracemalloc is slow, so allocations are measured on a sample
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    records: int
+    ops_per_sec: float
+    p50_us: float
+    p99_us: float
+    allocations_per_op: float
+    bytes_per_op: float
+
+
+Case = tuple[str, Callable[[Any], Any], Sequence[Any]]
+
+
+def percentile(sorted_values: Sequence[int], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[max(index, 0)]
+
+
+def measure(name: str, func: Callable[[Any], Any], payloads: Sequence[Any]) -> BenchmarkResult:
+    rounds = max(1, math.ceil(MIN_OPS / len(payloads)))
+
+    # throughput: a tight loop without any per-call timing overhead
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            func(payload)
+    elapsed = time.perf_counter() - start
+    ops_per_sec = rounds * len(payloads) / elapsed
+
+    # latency: every call is timed on its own
+    timings = []
+    clock = time.perf_counter_ns
+    for _ in range(rounds):
+        for payload in payloads:
+            call_start = clock()
+            func(payload)
+            timings.append(clock() - call_start)
+    timings.sort()
+
+    # allocations: the results are kept alive so the retained memory per call is visible
+    sample = payloads[:ALLOCATION_SAMPLE]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [func(payload) for payload in sample]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    allocations = sum(stat.count_diff for stat in diff)
+    allocated_bytes = sum(stat.size_diff for stat in diff)
+    del results
+
+    return BenchmarkResult(
+        name=name,
+        records=len(payloads),
+        ops_per_sec=ops_per_sec,
+        p50_us=percentile(timings, 0.50) / 1_000,
+        p99_us=percentile(timings, 0.99) / 1_000,
+        allocations_per_op=allocations / len(sample),
+        bytes_per_op=allocated_bytes / len(sample),
+    )
+
+
+def print_header() -> None:
+    print(f"{'case':<44} {'records':>9} {'ops/sec':>12} {'p50 us':>9} {'p99 us':>9} {'allocs/op':>10} {'bytes/op':>10}")
+
+
+def print_results(results: Iterable[BenchmarkResult]) -> None:
+    for result in results:
+        print(
+            f"{result.name:<44} {result.records:>9} {result.ops_per_sec:>12,.0f} {result.p50_us:>9.2f} "
+            f"{result.p99_us:>9.2f} {result.allocations_per_op:>10.1f} {result.bytes_per_op:>10.1f}"
+        )
+
+
+def save_baseline(results: Iterable[BenchmarkResult], path: Path) -> None:
+    path.write_text(json.dumps({result.name: asdict(result) for result in results}, indent=2))
+
+
+def find_regressions(results: Iterable[BenchmarkResult], path: Path, threshold: float) -> list[str]:
+    # a case regresses when its throughput drops, or its p99 latency grows, by more than threshold
+    baseline = json.loads(path.read_text())
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None:
+            continue
+        if result.ops_per_sec < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append(
+                f"{result.name}: {result.ops_per_sec:,.0f} ops/sec vs baseline {previous['ops_per_sec']:,.0f}"
+            )
+        if result.p99_us > previous["p99_us"] * (1 + threshold):
+            regressions.append(f"{result.name}: p99 {result.p99_us:.2f}us vs baseline {previous['p99_us']:.2f}us")
+    return regressions
+
+
+def benchmark_main(
+    description: str,
+    build_cases: Callable[[Sequence[int]], Iterable[Case]],
+    baseline_path: Path,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+) -> int:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=list(sizes))
+    parser.add_argument("--baseline", type=Path, default=baseline_path)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed regression, 0.10 = 10%%")
+    args = parser.parse_args()
+
+    print_header()
+    results = []
+    for name, func, payloads in build_cases(args.sizes):
+        results.append(measure(name, func, payloads))
+        print_results(results[-1:])
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}, run with --save-baseline to create one")
+        return 0
+
+    regressions = find_regressions(results, args.baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
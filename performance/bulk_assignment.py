@@ -0,0 +1,204 @@
+import contextlib
+from functools import lru_cache
+from typing import Any, Iterator
+
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+from pydantic_core import InitErrorDetails, SchemaValidator
+
+from benchmark import measure, print_header, print_results
+from core_schemas import model_core_config
+
+# With ConfigDict(validate_assignment=True) every `my_model.my_int = ...` is a validation round of its own,
+# including the model validators, so an update handler setting 20 fields runs the model validators 20 times.
+# model_update applies many assignments with one validation: the changed fields are validated with their
+# field validators, the unchanged ones are passed through as they are, and the model validators run once.
+#
+#     model_update(my_model, my_int=123, my_str="abc")
+#
+#     with bulk_assignment(my_model) as changes:
+#         changes.my_int = 123
+#         changes.my_str = "abc"
+#
+# The update is atomic: the fields are validated into a new instance first and its state replaces the
+# model's only if everything is valid, so on a ValidationError the model is left as it was.
+# Frozen models and frozen fields are rejected like a normal assignment.
+# The validator for each set of changed fields is built once and cached.
+# Model validators in "after" mode get that new instance as self, it has no private attributes yet.
+
+
+def model_fields_schema(schema: dict, model: type[BaseModel]) -> tuple[dict, list[dict]] | None:
+    # returns a copy of the model's own core schema (without the definitions) and the path to its
+    # model-fields schema in that copy - model validators wrap the model schema, field validators sit
+    # inside the fields
+    definitions = {}
+    if schema["type"] == "definitions":
+        definitions = {definition["ref"]: definition for definition in schema["definitions"]}
+        schema = schema["schema"]
+    if schema["type"] == "definition-ref":
+        schema = definitions[schema["schema_ref"]]
+    path = [{key: value for key, value in schema.items() if key != "ref"}]
+    while path[-1]["type"] != "model-fields":
+        if not isinstance(path[-1].get("schema"), dict):
+            return None  # e.g. a plain validator function, there are no fields to look up
+        path[-1]["schema"] = {key: value for key, value in path[-1]["schema"].items() if key != "ref"}
+        path.append(path[-1]["schema"])
+    if not any(node["type"] == "model" and node["cls"] is model for node in path):
+        return None
+    return path[0], path
+
+
+@lru_cache(maxsize=256)
+def _update_validator(model: type[BaseModel], changed: frozenset[str]) -> SchemaValidator:
+    schema = model.__pydantic_core_schema__
+    found = model_fields_schema(schema, model)
+    if found is None:
+        raise TypeError(f"{model.__name__} has no model fields schema to update")
+    model_schema, path = found
+    for node in path:
+        if node["type"] == "model":
+            node.pop("post_init", None)  # model_post_init already ran for the instance being updated
+            node["custom_init"] = False
+    fields_schema = path[-1]
+    fields_schema["fields"] = {
+        # the input is keyed by field name, the unchanged values are already valid
+        name: {
+            **{key: value for key, value in field.items() if key != "validation_alias"},
+            **({} if name in changed else {"schema": {"type": "any"}}),
+        }
+        for name, field in fields_schema["fields"].items()
+    }
+    if schema["type"] == "definitions":
+        model_schema = {**schema, "schema": model_schema}
+    return SchemaValidator(model_schema, model_core_config(schema))
+
+
+def model_update(model: BaseModel, **changes: Any) -> None:
+    """Assign several fields with one validation, all of them or none."""
+    cls = type(model)
+    errors: list[InitErrorDetails] = []
+    if cls.model_config.get("frozen"):
+        errors.extend({"type": "frozen_instance", "loc": (name,), "input": value} for name, value in changes.items())
+    for name, value in changes.items():
+        field_info = cls.model_fields.get(name)
+        if field_info is None and cls.model_config.get("extra") != "allow":
+            errors.append({"type": "no_such_attribute", "loc": (name,), "input": value, "ctx": {"attribute": name}})
+        elif field_info is not None and field_info.frozen:
+            errors.append({"type": "frozen_field", "loc": (name,), "input": value})
+    if errors:
+        raise ValidationError.from_exception_data(cls.__name__, errors)
+
+    validator = _update_validator(cls, frozenset(changes).intersection(cls.model_fields))
+    # only the fields, __dict__ also holds e.g. the values of functools.cached_property
+    current = {name: model.__dict__[name] for name in cls.model_fields}
+    updated = validator.validate_python({**current, **(model.__pydantic_extra__ or {}), **changes})
+
+    object.__setattr__(model, "__dict__", updated.__dict__)
+    object.__setattr__(model, "__pydantic_extra__", updated.__pydantic_extra__)
+    model.__pydantic_fields_set__.update(changes)
+
+
+class _Changes:
+    def __init__(self) -> None:
+        object.__setattr__(self, "values", {})
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self.values[name] = value
+
+
+@contextlib.contextmanager
+def bulk_assignment(model: BaseModel) -> Iterator[Any]:
+    """Collect assignments in the with block and apply them with model_update when it exits."""
+    changes = _Changes()
+    yield changes  # an exception in the block discards the changes
+    model_update(model, **changes.values)
+
+
+if __name__ == "__main__":
+
+    print("--- Bulk assignment ---")
+
+    class MyModel(BaseModel):
+        model_config = ConfigDict(validate_assignment=True)
+
+        my_int: int
+        my_str: str
+        my_upper_str: str = ""
+
+        @field_validator("my_str")
+        @classmethod
+        def validate_alphanumeric(cls, value: str) -> str:
+            if not value.isalnum():
+                raise ValueError("Must be alphanumeric")
+            return value
+
+        @model_validator(mode="after")
+        def validate_upper(self) -> "MyModel":
+            if self.my_upper_str and self.my_upper_str != self.my_str.upper():
+                raise ValueError("my_upper_str must be my_str in upper case")
+            return self
+
+    my_model = MyModel(my_int=123, my_str="abc")
+    model_update(my_model, my_int="456", my_str="def", my_upper_str="DEF")
+    print(my_model)  # my_int=456 my_str='def' my_upper_str='DEF'
+    print(my_model.model_fields_set)  # {'my_int', 'my_str', 'my_upper_str'}
+
+    # one at a time, the first assignment fails the model validator - together they are valid
+    try:
+        my_model.my_str = "ghi"
+    except ValidationError as e:
+        print(e.errors())  # Value error, my_upper_str must be my_str in upper case
+    with bulk_assignment(my_model) as changes:
+        changes.my_str = "ghi"
+        changes.my_upper_str = "GHI"
+    print(my_model)  # my_int=456 my_str='ghi' my_upper_str='GHI'
+
+    try:
+        model_update(my_model, my_int=789, my_str="g_h_i")
+    except ValidationError as e:
+        print(e.errors())  # Value error, Must be alphanumeric
+    print(my_model)  # my_int=456 my_str='ghi' my_upper_str='GHI' - rolled back, my_int is unchanged
+
+    print("\n--- Benchmark ---")
+
+    class MyWideModel(BaseModel):
+        model_config = ConfigDict(validate_assignment=True)
+
+        my_int_0: int
+        my_int_1: int
+        my_int_2: int
+        my_int_3: int
+        my_int_4: int
+        my_int_5: int
+        my_int_6: int
+        my_int_7: int
+        my_int_8: int
+        my_int_9: int
+        my_str_0: str
+        my_str_1: str
+        my_str_2: str
+        my_str_3: str
+        my_str_4: str
+        my_str_5: str
+        my_str_6: str
+        my_str_7: str
+        my_str_8: str
+        my_str_9: str
+
+        @model_validator(mode="after")
+        def validate_total(self) -> "MyWideModel":
+            if sum(getattr(self, f"my_int_{i}") for i in range(10)) < 0:
+                raise ValueError("total must not be negative")
+            return self
+
+    my_wide_model = MyWideModel(**{f"my_int_{i}": i for i in range(10)}, **{f"my_str_{i}": "abc" for i in range(10)})
+    updates = [{f"my_int_{i}": n for i in range(10)} | {f"my_str_{i}": str(n) for i in range(10)} for n in range(1_000)]
+
+    def assign_one_by_one(changes: dict[str, Any]) -> None:
+        for name, value in changes.items():
+            setattr(my_wide_model, name, value)
+
+    print_header()
+    print_results([
+        measure("20 assignments", assign_one_by_one, updates),
+        measure("model_update, 20 fields", lambda changes: model_update(my_wide_model, **changes), updates),
+    ])
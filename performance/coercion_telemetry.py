@@ -0,0 +1,231 @@
+import itertools
+import json
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Any, ClassVar, Iterator
+
+from pydantic import AliasChoices, AliasPath, BaseModel, ConfigDict
+from pydantic_core import PydanticUndefined, SchemaValidator, core_schema
+
+from benchmark import measure, print_header, print_results
+from core_schemas import NAMED_SCHEMA_KEYS, SCHEMA_KEYS, model_core_config
+
+# parsing_strict_mode.py coerces "123" -> int and 12.35 -> Decimal in lax mode, but nothing tells us how often
+# a field is really coerced in production. CoercionTelemetryModel counts, per model and field, the type each
+# input value arrived as and the type it was validated to, e.g. MyModel.my_int str->int: 1523.
+# A field that only ever sees int->int can be made strict without rejecting anything.
+#
+#     class MyModel(CoercionTelemetryModel):
+#         my_int: int
+#
+#     telemetry.snapshot()  # [CoercionCount(model='MyModel', field='my_int', rule='str->int', count=1), ...]
+#
+# With telemetry_sample_every = N only every N-th record of the model is counted. The model keeps pydantic's
+# own validator, so the records that are not counted are validated entirely in pydantic-core, at the cost
+# of a counter increment in __init__, model_validate and model_validate_json. A counted record goes through
+# a second validator built from the same schema, with one wrap function around every CoercionTelemetryModel
+# in it, not a function per field. Nested models are counted as fields of their own model, when the record
+# they arrive in is counted - nested in a plain BaseModel, they are validated by its validator and not counted.
+# The counters are shared by all threads and updated under a lock.
+
+
+@dataclass
+class CoercionCount:
+    model: str
+    field: str
+    rule: str  # "<input type>-><validated type>"
+    count: int
+
+
+class CoercionTelemetry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()  # (model, field, input type, output type) -> count
+
+    def record(self, model: type[BaseModel], data: dict[str, Any], instance: BaseModel) -> None:
+        values = instance.__dict__
+        counts = []
+        for name, keys in _input_keys(model):
+            for key in keys:
+                # the first key that is present is the one pydantic validated the field from
+                value = data.get(key, PydanticUndefined) if type(key) is str else key.search_dict_for_path(data)
+                if value is not PydanticUndefined:
+                    counts.append((model.__qualname__, name, type(value).__name__, type(values[name]).__name__))
+                    break
+        with self._lock:
+            self._counts.update(counts)
+
+    def snapshot(self) -> list[CoercionCount]:
+        with self._lock:
+            counts = list(self._counts.items())
+        return [
+            CoercionCount(model, field, f"{input_type}->{output_type}", count)
+            for (model, field, input_type, output_type), count in sorted(counts)
+        ]
+
+    def coercion_rates(self) -> dict[str, float]:
+        """The share of counted values that changed type, per "Model.field"."""
+        totals: Counter = Counter()
+        coerced: Counter = Counter()
+        for row in self.snapshot():
+            key = f"{row.model}.{row.field}"
+            totals[key] += row.count
+            input_type, output_type = row.rule.split("->")
+            if input_type != output_type:
+                coerced[key] += row.count
+        return {key: coerced[key] / total for key, total in totals.items()}
+
+    def export_json(self) -> str:
+        return json.dumps([asdict(row) for row in self.snapshot()])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+telemetry = CoercionTelemetry()
+
+
+def _input_keys(model: type[BaseModel]) -> list[tuple[str, list[str | AliasPath]]]:
+    # (field name, keys the value can arrive under, in pydantic's order) for every field, cached on the model
+    try:
+        return model.__dict__["__telemetry_keys__"]
+    except KeyError:
+        keys = []
+        for name, field_info in model.model_fields.items():
+            alias = field_info.validation_alias if field_info.validation_alias is not None else field_info.alias
+            choices = list(alias.choices) if isinstance(alias, AliasChoices) else [alias] if alias else []
+            if not choices or model.model_config.get("populate_by_name"):
+                choices.append(name)
+            keys.append((name, choices))
+        model.__telemetry_keys__ = keys
+        return keys
+
+
+def _counting(model: type[BaseModel]) -> Any:
+    def count_coercions(data: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> Any:
+        instance = handler(data)
+        if type(data) is dict:
+            telemetry.record(model, data, instance)
+        return instance
+
+    return count_coercions
+
+
+def _instrument(schema: Any) -> Any:
+    # a copy of the core schema with every CoercionTelemetryModel schema wrapped in its counting function.
+    # Only the keys that hold schema nodes are followed, defaults, literal values and the like are user data
+    # and kept as they are, and serializers do not validate anything
+    if isinstance(schema, (list, tuple)):
+        return type(schema)(_instrument(item) for item in schema)
+    if not isinstance(schema, dict):
+        return schema
+    schema = dict(schema)
+    for key in SCHEMA_KEYS.intersection(schema).difference({"serialization"}):
+        if key in NAMED_SCHEMA_KEYS and isinstance(schema[key], dict):
+            schema[key] = {name: _instrument(node) for name, node in schema[key].items()}
+        else:
+            schema[key] = _instrument(schema[key])
+    if schema.get("type") == "model" and issubclass(schema["cls"], CoercionTelemetryModel):
+        # a definition-ref points at the ref, so it moves to the wrapper
+        ref = schema.pop("ref", None)
+        return core_schema.no_info_wrap_validator_function(_counting(schema["cls"]), schema, ref=ref)
+    return schema
+
+
+class CoercionTelemetryModel(BaseModel):
+    telemetry_sample_every: ClassVar[int] = 1
+    __telemetry_calls__: ClassVar[Iterator[int]] = itertools.count(1)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        # a counter object, not an int: assigning a class attribute on every call would make every
+        # later attribute lookup on the class miss the type cache
+        cls.__telemetry_calls__ = itertools.count(1)
+
+    @classmethod
+    def _counting_validator(cls) -> SchemaValidator:
+        try:
+            return cls.__dict__["__counting_validator__"]
+        except KeyError:
+            # built on first use, from the same schema and config as pydantic's
+            if not cls.__pydantic_complete__:
+                cls.model_rebuild()
+            schema = cls.__pydantic_core_schema__
+            cls.__counting_validator__ = SchemaValidator(_instrument(schema), model_core_config(schema))
+            return cls.__counting_validator__
+
+    def __init__(self, /, **data: Any) -> None:
+        validator = self.__pydantic_validator__
+        if not next(self.__telemetry_calls__) % self.telemetry_sample_every:
+            validator = self._counting_validator()
+        validator.validate_python(data, self_instance=self)
+
+    # like BaseModel.__init__, so that pydantic does not route model_validate through __init__
+    __init__.__pydantic_base_init__ = True
+
+    @classmethod
+    def model_validate(
+        cls, obj: Any, *, strict: bool | None = None, from_attributes: bool | None = None, context: Any = None
+    ) -> Any:
+        validator = cls.__pydantic_validator__
+        if not next(cls.__telemetry_calls__) % cls.telemetry_sample_every:
+            validator = cls._counting_validator()
+        return validator.validate_python(obj, strict=strict, from_attributes=from_attributes, context=context)
+
+    @classmethod
+    def model_validate_json(
+        cls, json_data: str | bytes | bytearray, *, strict: bool | None = None, context: Any = None
+    ) -> Any:
+        validator = cls.__pydantic_validator__
+        if not next(cls.__telemetry_calls__) % cls.telemetry_sample_every:
+            validator = cls._counting_validator()
+        return validator.validate_json(json_data, strict=strict, context=context)
+
+if __name__ == "__main__":
+    import pprint
+
+    print("--- Coercion telemetry ---")
+
+    class MyModel(CoercionTelemetryModel):
+        my_int: int
+        my_number: Decimal
+
+    MyModel(my_int="123", my_number=12.35)
+    MyModel(my_int=123, my_number=12.35)
+    MyModel.model_validate_json('{"my_int": 123, "my_number": "12.35"}')
+    pprint.pp(telemetry.snapshot())  # my_int: int->int 2, str->int 1 - my_number: float->Decimal 2, str->Decimal 1
+    print(telemetry.coercion_rates())  # {'MyModel.my_int': 0.333..., 'MyModel.my_number': 1.0}
+    print(telemetry.export_json())
+
+    print("\n--- Benchmark ---")
+
+    class MyPlainModel(BaseModel):
+        my_int: int
+        my_str: str
+        my_float: float
+        my_number: Decimal
+
+    class MyStrictModel(MyPlainModel):
+        model_config = ConfigDict(strict=True)
+
+    class MyCountedModel(CoercionTelemetryModel):
+        my_int: int
+        my_str: str
+        my_float: float
+        my_number: Decimal
+
+    class MySampledModel(MyCountedModel):
+        telemetry_sample_every = 100
+
+    payloads = [{"my_int": i, "my_str": "abc", "my_float": 1.5, "my_number": Decimal(i)} for i in range(1_000)]
+    print_header()
+    print_results([
+        measure("BaseModel", MyPlainModel.model_validate, payloads),
+        measure("BaseModel, strict=True", MyStrictModel.model_validate, payloads),
+        measure("telemetry, every record", MyCountedModel.model_validate, payloads),
+        measure("telemetry, every 100th record", MySampledModel.model_validate, payloads),
+    ])
@@ -0,0 +1,483 @@
+import operator
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from string import ascii_letters, digits
+from typing import Any, Mapping, Optional
+
+from pydantic import BaseModel, Field
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, it is only needed for this module
+    np = None
+
+# Field constraints (gt, min_length, pattern, decimal_places, ...) checked on whole numpy columns,
+# read from model_fields[...].metadata, without building a model per row.
+# Checks follow the field annotation, not the column dtype. Decimal columns are parsed as text with np.char
+# (exponents and padding included); non-numbers are reported as decimal_parsing / finite_number like pydantic.
+# Simple anchored character-class patterns are vectorized, other patterns run re.search per row.
+
+ASCII = 128
+CLASS_ESCAPES = {"d": digits, "w": ascii_letters + digits + "_", "s": " \t\n\r\x0b\x0c"}
+SPECIAL = set(".^$*+?{}[]()|\\")
+QUANTIFIER = re.compile(r"\*|\+|\?|\{(\d+)(,(\d*))?\}")
+EXPONENT_LIMIT = 10**15  # exponents beyond this are far past any digit or bound constraint
+
+
+def ascii_table(characters: Any) -> "np.ndarray":
+    table = np.zeros(ASCII, dtype=bool)
+    table[[ord(character) if isinstance(character, str) else character for character in characters]] = True
+    return table
+
+
+def escape_table(character: str) -> Optional["np.ndarray"]:
+    # \d, \w and \s with their ASCII members, \D, \W and \S as the complement; any other letter is not supported
+    if character.lower() in CLASS_ESCAPES:
+        table = ascii_table(CLASS_ESCAPES[character.lower()])
+        return ~table if character.isupper() else table
+    if character.isalnum():
+        return None
+    return ascii_table(character)
+
+
+def class_table(pattern: str, position: int) -> tuple[Optional["np.ndarray"], int]:
+    # the table of a "[...]" class starting at position, and the position after its "]"
+    position += 1
+    negate = pattern.startswith("^", position)
+    position += negate
+    table = np.zeros(ASCII, dtype=bool)
+    first = position
+    while position < len(pattern) and (pattern[position] != "]" or position == first):
+        if pattern[position] == "\\":
+            member = escape_table(pattern[position + 1]) if position + 1 < len(pattern) else None
+            if member is None:
+                return None, position
+            table |= member
+            position += 2
+            continue
+        if pattern[position] == "[":
+            return None, position  # nested classes and [:alpha:]
+        start = pattern[position]
+        if pattern.startswith("-", position + 1) and position + 2 < len(pattern) and pattern[position + 2] != "]":
+            end = pattern[position + 2]
+            table[ord(start) : min(ord(end) + 1, ASCII)] = True
+            position += 3
+        else:
+            table |= ascii_table(start if ord(start) < ASCII else "")
+            position += 1
+    if position >= len(pattern):
+        return None, position
+    return (~table if negate else table), position + 1
+
+
+def pattern_atoms(pattern: str) -> Optional[list[tuple["np.ndarray", int, Optional[int]]]]:
+    """Split an anchored pattern of character classes into (allowed ASCII codes, min count, max count) atoms.
+
+    '^[A-Z]{2}\\d+$' becomes [(A-Z, 2, 2), (0-9, 1, None)]. At most one atom may have a variable count,
+    anything else (groups, alternation, unanchored patterns) returns None.
+    """
+    if not pattern.startswith("^") or not pattern.endswith("$") or pattern.endswith("\\$"):
+        return None
+    body, position, atoms = pattern[1:-1], 0, []
+    while position < len(body):
+        character = body[position]
+        if character == "[":
+            table, position = class_table(body, position)
+        elif character == "\\" and position + 1 < len(body):
+            table, position = escape_table(body[position + 1]), position + 2
+        elif character == ".":
+            table, position = ~ascii_table("\n"), position + 1
+        elif character in SPECIAL:
+            return None
+        else:
+            table, position = ascii_table(character if ord(character) < ASCII else ""), position + 1
+        if table is None:
+            return None
+
+        quantifier = QUANTIFIER.match(body, position)
+        if quantifier is None:
+            low, high = 1, 1
+        else:
+            position = quantifier.end()
+            low, high = {"*": (0, None), "+": (1, None), "?": (0, 1)}.get(quantifier.group(), (None, None))
+            if quantifier.group(1) is not None:
+                low = int(quantifier.group(1))
+                high = low if quantifier.group(2) is None else int(quantifier.group(3)) if quantifier.group(3) else None
+        atoms.append((table, low, high))
+    if sum(low != high for _, low, high in atoms) > 1:
+        return None
+    return atoms
+
+
+def character_codes(column: "np.ndarray") -> "np.ndarray":
+    # the fixed width "U"/"S" column as a (rows, width) matrix of code points or bytes
+    column = np.ascontiguousarray(column)
+    unit = np.uint32 if column.dtype.kind == "U" else np.uint8
+    return column.view(unit).reshape(len(column), column.dtype.itemsize // np.dtype(unit).itemsize)
+
+
+def atoms_check(column: "np.ndarray", atoms: list[tuple["np.ndarray", int, Optional[int]]]) -> "np.ndarray":
+    # the atoms before the variable one sit at fixed positions from the start, those after it at fixed
+    # positions from the end, and every character in between must belong to the variable atom
+    codes = character_codes(column)
+    width = codes.shape[1]
+    length = np.char.str_len(column)
+    variable = next((index for index, (_, low, high) in enumerate(atoms) if low != high), len(atoms))
+    low = sum(low for _, low, _ in atoms)
+    high = None if any(high is None for _, _, high in atoms) else sum(high for _, _, high in atoms)
+    passed = (length >= low) & (length <= (high if high is not None else width))
+    if low > width:
+        return passed
+
+    ascii_codes = np.minimum(codes, ASCII - 1)
+    rows = np.arange(len(column))
+    position = 0
+    for table, count, _ in atoms[:variable]:
+        for _ in range(count):
+            passed &= table[ascii_codes[:, position]]
+            position += 1
+    offset = sum(count for _, count, _ in atoms[variable + 1 :])
+    end = length - offset
+    for table, count, _ in atoms[variable + 1 :]:
+        for _ in range(count):
+            passed &= table[ascii_codes[rows, np.clip(length - offset, 0, width - 1)]]
+            offset -= 1
+    if variable < len(atoms):
+        positions = np.arange(width)
+        inside = (positions >= position) & (positions < end[:, None])
+        passed &= (atoms[variable][0][ascii_codes] | ~inside).all(axis=1)
+    return passed
+
+
+def pattern_check(column: "np.ndarray", pattern: str) -> "np.ndarray":
+    atoms = pattern_atoms(pattern)
+    if atoms is None:
+        regex = re.compile(pattern.encode() if column.dtype.kind == "S" else pattern)
+        return np.fromiter((regex.search(item) is not None for item in column), dtype=bool, count=len(column))
+
+    passed = atoms_check(column, atoms)
+    non_ascii = (character_codes(column) >= ASCII).any(axis=1)
+    if non_ascii.any():
+        # "^...$" is a full match, the same for pydantic's regex and for re.fullmatch
+        body = pattern[1:-1]
+        regex = re.compile(body.encode() if column.dtype.kind == "S" else body)
+        passed[non_ascii] = [regex.fullmatch(item) is not None for item in column[non_ascii].tolist()]
+    return passed
+
+
+def multiple_of_check(column: "np.ndarray", multiple_of: Any) -> "np.ndarray":
+    if column.dtype.kind in "iu" and isinstance(multiple_of, int):
+        return np.remainder(column, multiple_of) == 0
+    # pydantic-core's float check, with the remainder taking the sign of the value like Rust's %
+    remainder = np.fmod(column, multiple_of)
+    threshold = np.abs(column) / 1e9
+    return (np.abs(remainder) <= threshold) | (np.abs(remainder - multiple_of) <= threshold)
+
+
+NUMERIC_CHECKS = {
+    "gt": lambda column, value: column > value,
+    "ge": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "le": lambda column, value: column <= value,
+    "multiple_of": lambda column, value: multiple_of_check(column, value),
+    "allow_inf_nan": lambda column, value: value or np.isfinite(column),
+}
+DECIMAL_BOUNDS = {"gt": operator.gt, "ge": operator.ge, "lt": operator.lt, "le": operator.le}
+
+STRING_CHECKS = {
+    "min_length": lambda column, value: np.char.str_len(column) >= value,
+    "max_length": lambda column, value: np.char.str_len(column) <= value,
+    "pattern": lambda column, value: pattern_check(column, value),
+}
+STRING_TYPES = {str: str, bytes: bytes}  # annotation -> numpy dtype of its np.char column
+
+# constraints set on the config apply to every str field that does not set its own
+CONFIG_STRING_CONSTRAINTS = {"str_min_length": "min_length", "str_max_length": "max_length"}
+
+
+@dataclass
+class ColumnarResult:
+    mask: "np.ndarray"  # True for every row that passes all constraints
+    errors: dict[str, "np.ndarray"] = field(default_factory=dict)  # "field.constraint" -> failing row positions
+
+
+@dataclass
+class DecimalColumn:
+    # every valid value as sign * coefficient * 10 ** exponent, the coefficient without leading or trailing zeros
+    sign: "np.ndarray"  # -1, 0 or 1, 0 for zero and for rows that are not numbers
+    coefficient: "np.ndarray"  # the significant digits as text, "" for zero
+    exponent: "np.ndarray"
+    whole_digits: "np.ndarray"
+    decimals: "np.ndarray"
+    parsed: "np.ndarray"  # False where the text is not a number
+    finite: "np.ndarray"  # False for NaN and Infinity
+
+
+def metadata_constraints(metadata: Any) -> dict[str, Any]:
+    # annotated_types (Gt, MinLen, ...) are slotted dataclasses, pydantic's own metadata is a plain object,
+    # anything else in Annotated (a doc string, a number) carries no constraints
+    if hasattr(metadata, "__dict__"):
+        items = vars(metadata).items()
+    elif hasattr(metadata, "__slots__"):
+        items = ((key, getattr(metadata, key)) for key in metadata.__slots__)
+    else:
+        return {}
+    return {key: value for key, value in items if value is not None}
+
+
+def column_constraints(model: type[BaseModel]) -> dict[str, dict[str, Any]]:
+    """Collect the constraints of every field from its metadata, e.g. {'my_int': {'gt': 0}}."""
+    constraints = {}
+    for name, field_info in model.model_fields.items():
+        field_constraints = {}
+        if field_info.annotation is str:
+            for config_key, constraint in CONFIG_STRING_CONSTRAINTS.items():
+                if model.model_config.get(config_key) is not None:
+                    field_constraints[constraint] = model.model_config[config_key]
+        for metadata in field_info.metadata:
+            field_constraints.update(metadata_constraints(metadata))
+        if field_constraints:
+            constraints[name] = field_constraints
+    return constraints
+
+
+def decimal_text(item: str) -> str:
+    # underscores and non-ASCII digits are rare, Decimal spells them out in ASCII
+    try:
+        return str(Decimal(item)).lower()
+    except InvalidOperation:
+        return "-"  # not a number for parse_decimals either
+
+
+def all_digits(column: "np.ndarray") -> "np.ndarray":
+    return (column == "") | np.char.isdigit(column)
+
+
+def parse_decimals(column: "np.ndarray") -> DecimalColumn:
+    """Split every value of the column into sign, significant digits and exponent, the way Decimal reads it."""
+    text = np.char.strip(column if column.dtype.kind == "U" else column.astype(str))
+    codes = character_codes(text)
+    text = np.where((codes >= ord("A")) & (codes <= ord("Z")), codes | 0x20, codes).view(text.dtype).ravel()  # lower()
+    unusual = (codes >= ASCII).any(axis=1) | (np.char.find(text, "_") >= 0)
+    if unusual.any():
+        spelled_out = np.array([decimal_text(item) for item in text[unusual].tolist()])
+        text = text.astype(np.result_type(text, spelled_out))
+        text[unusual] = spelled_out
+
+    unsigned = np.char.lstrip(text, "+-")
+    one_sign = np.char.str_len(text) - np.char.str_len(unsigned) <= 1
+    signaling, nan, payload = np.char.partition(unsigned, "nan").T
+    nan = (nan != "") & np.isin(signaling, ["", "s"]) & all_digits(payload)  # "nan", "snan" and "nan5"
+    finite = ~(one_sign & (np.isin(unsigned, ["inf", "infinity"]) | nan))
+
+    mantissa, has_exponent, exponent_text = np.char.partition(unsigned, "e").T
+    whole, _, fraction = np.char.partition(mantissa, ".").T
+    exponent_digits = np.char.lstrip(exponent_text, "+-")
+    parsed = (
+        one_sign
+        & finite
+        & (np.char.str_len(whole) + np.char.str_len(fraction) > 0)
+        & all_digits(whole)
+        & all_digits(fraction)
+        & ((has_exponent == "") | (np.char.str_len(exponent_text) - np.char.str_len(exponent_digits) <= 1))
+        & ((has_exponent == "") | ((exponent_digits != "") & all_digits(exponent_digits)))
+    )
+
+    exponent = np.zeros(len(text), dtype=np.int64)
+    if (has_exponent != "").any():
+        exponent_digits = np.char.lstrip(np.where(parsed, exponent_digits, ""), "0")
+        exponent_digits = np.where(np.char.str_len(exponent_digits) > 15, str(EXPONENT_LIMIT), exponent_digits)
+        exponent = np.char.zfill(exponent_digits, 1).astype(np.int64)
+        exponent = np.where(np.char.startswith(exponent_text, "-"), -exponent, exponent)
+    exponent -= np.char.str_len(fraction)
+
+    significant = np.char.lstrip(np.where(parsed, np.char.add(whole, fraction), ""), "0")
+    coefficient = np.char.rstrip(significant, "0")
+    zero = coefficient == ""
+    normalized = exponent + np.char.str_len(significant) - np.char.str_len(coefficient)
+
+    # pydantic's digit counting: "1.230" has 2 decimal places, "1.5e2" 3 digits and "0.00" no whole digit
+    length = np.char.str_len(coefficient)
+    decimals = np.where(zero, 0, np.maximum(-normalized, 0))
+    total = np.where(normalized >= 0, length + normalized, np.maximum(length, decimals))
+    whole_digits = np.where(zero, exponent >= 0, total - decimals).astype(np.int64)
+    sign = np.where(zero, 0, np.where(np.char.startswith(text, "-"), -1, 1))
+    return DecimalColumn(sign, coefficient, normalized, whole_digits, decimals, parsed, finite)
+
+
+def normalized_decimal(value: Any) -> tuple[int, str, int]:
+    # (sign, significant digits, exponent) of a constraint value, read from str() like pydantic does
+    sign, coefficient, exponent = Decimal(str(value)).as_tuple()
+    significant = "".join(map(str, coefficient)).lstrip("0")
+    coefficient = significant.rstrip("0")
+    return (0 if not coefficient else -1 if sign else 1), coefficient, exponent + len(significant) - len(coefficient)
+
+
+def compare_decimals(column: DecimalColumn, value: Any) -> "np.ndarray":
+    # -1, 0 or 1 for every row against value: the signs first, then the magnitude (position of the first
+    # significant digit), then the significant digits themselves as equally long strings
+    sign, coefficient, exponent = normalized_decimal(value)
+    width = max(len(coefficient), int(np.char.str_len(column.coefficient).max(initial=0)))
+    padded = np.char.ljust(column.coefficient, width, "0")
+    by_digits = (padded > coefficient.ljust(width, "0")).astype(int) - (padded < coefficient.ljust(width, "0"))
+    magnitude = column.exponent + np.char.str_len(column.coefficient) - (exponent + len(coefficient))
+    by_magnitude = np.where(magnitude != 0, np.sign(magnitude), by_digits)
+    return np.where(column.sign != sign, np.sign(column.sign - sign), column.sign * by_magnitude)
+
+
+def decimal_multiple_of_check(column: DecimalColumn, multiple_of: Any) -> "np.ndarray":
+    # C * 10**e is a multiple of M * 10**m when (C % M) * (10**(e - m) % M) % M == 0. C has no trailing zeros,
+    # so below the exponent of the multiple only zero passes. The remainders stay below M**2, which fits int64
+    # for M up to 3e9; longer multiples use Python ints in an object array.
+    _, coefficient, exponent = normalized_decimal(abs(Decimal(str(multiple_of))))
+    modulus = int(coefficient or 0)
+    dtype = np.int64 if modulus < 3_000_000_000 else object
+
+    width = max(int(np.char.str_len(column.coefficient).max(initial=0)), 1)
+    codes = character_codes(np.char.zfill(column.coefficient, width).astype(f"U{width}")).astype(dtype) - 48
+    remainder = np.zeros(len(codes), dtype=dtype)
+    for digit in codes.T:
+        remainder = (remainder * 10 + digit) % modulus
+
+    shift = column.exponent - exponent
+    power, base, bits = np.ones(len(codes), dtype=dtype), np.full(len(codes), 10 % modulus, dtype), np.maximum(shift, 0)
+    while bits.any():
+        power = np.where(bits & 1, power * base % modulus, power)
+        base = base * base % modulus
+        bits >>= 1
+    return (column.sign == 0) | ((shift >= 0) & (remainder * power % modulus == 0))
+
+
+def digit_checks(
+    whole_digits: "np.ndarray", decimals: "np.ndarray", constraints: dict[str, Any]
+) -> dict[str, "np.ndarray"]:
+    checks = {}
+    decimal_places = constraints.get("decimal_places")
+    max_digits = constraints.get("max_digits")
+    if decimal_places is not None:
+        checks["decimal_places"] = decimals <= decimal_places
+    if max_digits is not None:
+        checks["max_digits"] = whole_digits + decimals <= max_digits
+    if decimal_places is not None and max_digits is not None:
+        checks["whole_digits"] = whole_digits <= max_digits - decimal_places
+    return checks
+
+
+def decimal_checks(column: "np.ndarray", constraints: dict[str, Any]) -> dict[str, "np.ndarray"]:
+    parsed = parse_decimals(column)
+    checks = {"decimal_parsing": parsed.parsed | ~parsed.finite, "finite_number": parsed.finite}
+    checks.update(digit_checks(parsed.whole_digits, parsed.decimals, constraints))
+    for constraint, check in DECIMAL_BOUNDS.items():
+        if constraint in constraints:
+            checks[constraint] = check(compare_decimals(parsed, constraints[constraint]), 0)
+    if "multiple_of" in constraints:
+        checks["multiple_of"] = decimal_multiple_of_check(parsed, constraints["multiple_of"])
+    # rows that are not numbers are reported once, as decimal_parsing or finite_number
+    return {
+        constraint: passed if constraint in ("decimal_parsing", "finite_number") else passed | ~parsed.parsed
+        for constraint, passed in checks.items()
+    }
+
+
+def validate_columns(model: type[BaseModel], columns: Mapping[str, "np.ndarray"]) -> ColumnarResult:
+    """Check whole columns against the model's Field constraints.
+
+    Only the constraints are checked - types are expected to already match the column dtypes.
+    Without any columns or rows the result is empty.
+    """
+    if np is None:
+        raise ImportError("validate_columns requires numpy, install it with `pip install numpy`")
+
+    length = len(next(iter(columns.values()))) if columns else 0
+    mask = np.ones(length, dtype=bool)
+    if not length:
+        return ColumnarResult(mask=mask)  # np.char.partition cannot handle empty columns
+    errors = {}
+    for name, constraints in column_constraints(model).items():
+        if name not in columns:
+            continue
+        column = np.asarray(columns[name])
+        annotation = model.model_fields[name].annotation
+
+        if annotation is Decimal:
+            checks = decimal_checks(column, constraints)
+        else:
+            if annotation in STRING_TYPES:
+                available = STRING_CHECKS
+                if column.dtype.kind not in "US":
+                    column = column.astype(STRING_TYPES[annotation])
+            else:
+                available = NUMERIC_CHECKS
+            checks = {
+                constraint: available[constraint](column, value)
+                for constraint, value in constraints.items()
+                if constraint in available
+            }
+
+        for constraint, passed in checks.items():
+            passed = np.broadcast_to(passed, length)
+            if not passed.all():
+                errors[f"{name}.{constraint}"] = np.flatnonzero(~passed)
+                mask &= passed
+    return ColumnarResult(mask=mask, errors=errors)
+
+
+if __name__ == "__main__":
+
+    print("--- Columnar constraints ---")
+
+    class MyModel(BaseModel):
+        my_int: int = Field(default=123, gt=0)
+        my_str: str = Field(min_length=3, pattern=r"^\d*$")
+        my_decimal: Decimal = Field(decimal_places=2)
+
+    print(column_constraints(MyModel))
+    # {'my_int': {'gt': 0}, 'my_str': {'min_length': 3, 'pattern': '^\\d*$'}, 'my_decimal': {'decimal_places': 2}}
+
+    columns = {
+        "my_int": np.array([45, -45, 3]),
+        "my_str": np.array(["123", "12", "123b"]),
+        "my_decimal": np.array(["23.45", "23.455", "1.230"]),
+    }
+    result = validate_columns(MyModel, columns)
+    print(result.mask)  # [ True False False]
+    print(result.errors)
+    # {'my_int.gt': array([1]), 'my_str.min_length': array([1]), 'my_str.pattern': array([2]),
+    #  'my_decimal.decimal_places': array([1])}
+
+    # exponent notation and padding are read like Decimal reads them, anything else is reported like pydantic does
+    result = validate_columns(MyModel, {"my_decimal": np.array(["1e-5", "1.5e2", " 2.50 ", "NaN", "12,5"])})
+    print(result.errors)
+    # {'my_decimal.decimal_parsing': array([4]), 'my_decimal.finite_number': array([3]),
+    #  'my_decimal.decimal_places': array([0])}
+
+    print(validate_columns(MyModel, {}))  # ColumnarResult(mask=array([], dtype=bool), errors={})
+
+    print("\n--- Benchmark ---")
+    import time
+
+    size = 1_000_000
+    rng = np.random.default_rng(0)
+    columns = {
+        "my_int": rng.integers(-10, 1_000, size),
+        "my_str": rng.integers(100, 100_000, size).astype(str),
+        "my_decimal": np.round(rng.random(size) * 100, 2).astype(str),
+    }
+    start = time.perf_counter()
+    result = validate_columns(MyModel, columns)
+    print(f"columnar: {size} rows in {time.perf_counter() - start:.2f}s, {int(result.mask.sum())} valid")
+
+    rows = [
+        {"my_int": int(my_int), "my_str": my_str, "my_decimal": my_decimal}
+        for my_int, my_str, my_decimal in zip(*(columns[name][:100_000].tolist() for name in columns))
+    ]
+    start = time.perf_counter()
+    valid = 0
+    for row in rows:
+        try:
+            MyModel(**row)
+            valid += 1
+        except ValueError:
+            pass
+    print(f"per row:  {len(rows)} rows in {time.perf_counter() - start:.2f}s, {valid} valid")
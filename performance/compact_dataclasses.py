@@ -0,0 +1,115 @@
+import dataclasses
+import pprint
+from dataclasses import InitVar
+from typing import Any, Callable, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic.dataclasses import dataclass
+from pydantic.fields import FieldInfo
+
+from benchmark import measure, print_header, print_results
+
+# Every instance of a pydantic dataclass (MyDataClass in fields.py, the alphanumeric MyModel in
+# validation/12_dataclass_validation.py) carries its own __dict__. With tens of millions of instances
+# that dict is most of the memory. compact_dataclass is a pydantic dataclass with __slots__ instead.
+#
+# dataclass(slots=True) alone breaks Field(init_var=True): the field still gets a slot that is never
+# filled, so repr() and model_dump() fail with an AttributeError. compact_dataclass turns those fields
+# into real dataclasses.InitVar fields first, so they get no slot and stay out of the dump.
+# Validators and kw_only keep working as they do on a normal pydantic dataclass.
+
+T = TypeVar("T")
+
+
+def _init_vars_to_initvar(cls: type) -> None:
+    annotations = cls.__dict__.get("__annotations__", {})
+    for name, default in vars(cls).items():
+        if isinstance(default, FieldInfo) and default.init_var and name in annotations:
+            annotations[name] = InitVar[annotations[name]]
+
+
+def compact_dataclass(cls: type[T] | None = None, /, **kwargs: Any) -> type[T] | Callable[[type[T]], type[T]]:
+    """A pydantic dataclass that uses __slots__, use it like @dataclass or @dataclass(frozen=True)."""
+
+    def wrap(cls: type[T]) -> type[T]:
+        _init_vars_to_initvar(cls)
+        return dataclass(cls, slots=True, **kwargs)
+
+    return wrap if cls is None else wrap(cls)
+
+
+if __name__ == "__main__":
+
+    print("--- Compact dataclass ---")
+
+    @compact_dataclass
+    class MyDataClass:
+        my_int: int = Field(init=True)
+        my_init_var: str = Field(init_var=True)
+
+    class MyModel(BaseModel):
+        my_dataclass: MyDataClass
+
+    my_dataclass = MyDataClass(my_int=123, my_init_var="foo")
+    print(hasattr(my_dataclass, "__dict__"))  # False
+    print(MyModel(my_dataclass=my_dataclass).model_dump())  # {'my_dataclass': {'my_int': 123}}
+
+    @compact_dataclass
+    class MyDataClass:
+        my_kw_only: str = Field(kw_only=True)
+
+    try:
+        print(MyDataClass("hello"))
+    except ValidationError as e:
+        pprint.pp(e.errors())  # unexpected_positional_argument
+
+    @compact_dataclass
+    class MyAlphanumeric:
+        my_str_1: str
+        my_str_2: str
+
+        @field_validator("my_str_1", "my_str_2")
+        @classmethod
+        def validate_alphanumeric(cls, value: str) -> str:
+            if not value.isalnum():
+                raise ValueError("Must be alphanumeric")
+            return value
+
+    try:
+        MyAlphanumeric(my_str_1="ab_c", my_str_2="def")
+    except ValidationError as e:
+        pprint.pp(e.errors())  # Value error, Must be alphanumeric
+
+    print("\n--- Benchmark ---")
+
+    class MyBaseModel(BaseModel):
+        my_int: int
+        my_str: str
+        my_float: float
+
+    @dataclass
+    class MyPydanticDataclass:
+        my_int: int
+        my_str: str
+        my_float: float
+
+    @compact_dataclass
+    class MyCompactDataclass:
+        my_int: int
+        my_str: str
+        my_float: float
+
+    @dataclasses.dataclass(slots=True)
+    class MyStdlibSlotsDataclass:
+        my_int: int
+        my_str: str
+        my_float: float
+
+    payloads = [{"my_int": i, "my_str": "abc", "my_float": 1.5} for i in range(1_000)]
+    print_header()
+    print_results([
+        measure("BaseModel", lambda payload: MyBaseModel(**payload), payloads),
+        measure("pydantic dataclass", lambda payload: MyPydanticDataclass(**payload), payloads),
+        measure("compact_dataclass", lambda payload: MyCompactDataclass(**payload), payloads),
+        measure("stdlib slots dataclass (no validation)", lambda payload: MyStdlibSlotsDataclass(**payload), payloads),
+    ])
@@ -0,0 +1,157 @@
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+from benchmark import measure, print_header, print_results
+
+# ConfigDict(extra="allow") keeps the unknown keys of every instance in its own dict. Upstream payloads
+# carry dozens of pass-through keys and every record has the same key set, so most of that memory is
+# the same keys and hash table repeated per instance.
+# CompactExtrasModel stores the extras like CPython's key-sharing dicts: the key layout is interned and
+# shared by every instance with the same keys, each instance only keeps a tuple of the values.
+#
+#     class MyModel(CompactExtrasModel):
+#         my_int: int
+#
+# __pydantic_extra__ is a property on the model that builds a dict from the layout when pydantic asks for
+# it (model_dump, ==, model_copy), so everything that works with extra="allow" keeps working.
+# Attribute access (my_model.another_str) reads the values tuple directly.
+# The saving is memory, not time: every validation splits the extras into layout and values, and every dump
+# builds the dict again, so validation and model_dump_json are slower than with a plain extra="allow" model
+# (see the benchmark below). It pays off for instances that are held in memory in large numbers.
+#
+# There is no lazy mode that keeps the extras as JSON: pydantic-core parses the whole input before the model
+# sees it and does not hand out the byte slices of the extras. Encoding the parsed values back to JSON costs
+# more CPU than it saves memory, and JSON has no NaN or Infinity to keep float extras as they were.
+
+MAX_LAYOUTS = 10_000  # distinct key sets that are shared, after that each instance gets its own layout
+
+
+class ExtrasLayout:
+    __slots__ = ("keys", "index")
+
+    def __init__(self, keys: tuple[str, ...]):
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+
+
+_LAYOUTS: dict[tuple[str, ...], ExtrasLayout] = {}
+
+
+def extras_layout(keys: tuple[str, ...]) -> ExtrasLayout:
+    layout = _LAYOUTS.get(keys)
+    if layout is None:
+        layout = ExtrasLayout(keys)
+        if len(_LAYOUTS) < MAX_LAYOUTS:
+            _LAYOUTS[keys] = layout
+    return layout
+
+
+class _ExtrasDict(dict):
+    # the dict pydantic gets for __pydantic_extra__, `model.__pydantic_extra__[key] = value` is written back
+    def __init__(self, model: "CompactExtrasModel", *args: Any):
+        super().__init__(*args)
+        self.model = model
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.model.__pydantic_extra__ = self
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.model.__pydantic_extra__ = self
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> dict[str, Any]:
+        from copy import deepcopy
+
+        return {key: deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self) -> Any:
+        return dict, (dict(self),)
+
+
+class CompactExtrasModel(BaseModel):
+    __slots__ = ("_extras_layout", "_extras_values")
+    model_config = ConfigDict(extra="allow")
+
+    @property
+    def __pydantic_extra__(self) -> dict[str, Any] | None:
+        layout, values = self._extras()
+        if layout is None:
+            return None
+        return _ExtrasDict(self, zip(layout.keys, values))
+
+    @__pydantic_extra__.setter
+    def __pydantic_extra__(self, extra: dict[str, Any] | None) -> None:
+        if extra is None:
+            object.__setattr__(self, "_extras_layout", None)
+            object.__setattr__(self, "_extras_values", ())
+        else:
+            object.__setattr__(self, "_extras_layout", extras_layout(tuple(extra)))
+            object.__setattr__(self, "_extras_values", tuple(extra.values()))
+
+    def _extras(self) -> tuple[ExtrasLayout | None, tuple[Any, ...]]:
+        return object.__getattribute__(self, "_extras_layout"), object.__getattribute__(self, "_extras_values")
+
+    def __getattr__(self, item: str) -> Any:
+        try:
+            layout, values = self._extras()
+        except AttributeError:  # not fully initialized yet
+            return super().__getattr__(item)
+        position = layout.index.get(item) if layout is not None else None
+        if position is None:
+            return super().__getattr__(item)
+        return values[position]
+
+
+if __name__ == "__main__":
+    import json
+
+    print("--- Compact extras ---")
+
+    class MyModel(CompactExtrasModel):
+        my_int: int
+        my_str: str
+
+    my_model = MyModel(my_int=123, my_str="abc", another_str="edf")
+    print(my_model)  # my_int=123 my_str='abc' another_str='edf'
+    print(my_model.another_str)  # edf
+    print(my_model.model_extra)  # {'another_str': 'edf'}
+    print(my_model.model_dump_json())  # {"my_int":123,"my_str":"abc","another_str":"edf"}
+
+    my_model.another_int = 456
+    print(my_model.model_dump())  # {'my_int': 123, 'my_str': 'abc', 'another_str': 'edf', 'another_int': 456}
+
+    my_other_model = MyModel(my_int=1, my_str="def", another_str="ghi")
+    print(my_other_model._extras_layout is MyModel(my_int=2, my_str="jkl", another_str="mno")._extras_layout)  # True
+
+    print("\n--- Benchmark: 40 pass-through keys per record ---")
+
+    class MyPlainModel(BaseModel):
+        model_config = ConfigDict(extra="allow")
+
+        my_int: int
+        my_str: str
+
+    payloads = [
+        {"my_int": i, "my_str": "abc", **{f"pass_through_{key}": f"value {i}-{key}" for key in range(40)}}
+        for i in range(1_000)
+    ]
+    json_payloads = [json.dumps(payload) for payload in payloads]
+    plain_models = [MyPlainModel(**payload) for payload in payloads]
+    compact_models = [MyModel(**payload) for payload in payloads]
+
+    print_header()
+    print_results([
+        measure("validate, extra='allow'", MyPlainModel.model_validate, payloads),
+        measure("validate, CompactExtrasModel", MyModel.model_validate, payloads),
+        measure("validate_json, extra='allow'", MyPlainModel.model_validate_json, json_payloads),
+        measure("validate_json, CompactExtrasModel", MyModel.model_validate_json, json_payloads),
+        measure("getattr extra, extra='allow'", lambda model: model.pass_through_39, plain_models),
+        measure("getattr extra, CompactExtrasModel", lambda model: model.pass_through_39, compact_models),
+        measure("dump_json, extra='allow'", MyPlainModel.model_dump_json, plain_models),
+        measure("dump_json, CompactExtrasModel", MyModel.model_dump_json, compact_models),
+    ])
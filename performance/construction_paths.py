@@ -0,0 +1,44 @@
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from pydantic import BaseModel
+
+from benchmark import Case, benchmark_main
+
+# Benchmarks every way models.py builds a model:
+#   MyModel(**external_data), MyModel.model_validate(external_data) and nesting it in TopModel
+#
+# python performance/construction_paths.py --save-baseline   # record a baseline
+# python performance/construction_paths.py --threshold 0.2   # fail (exit code 1) on a >20% regression
+# python performance/construction_paths.py --sizes 1,1000    # skip the 1M records run
+
+
+class MyModel(BaseModel):
+    my_int: int
+    my_str: str
+
+class TopModel(BaseModel):
+    my_model: MyModel
+
+
+def build_cases(sizes: Sequence[int]) -> Iterator[Case]:
+    # a generator, so the payloads of one size are released before the next size is built
+    for size in sizes:
+        flat = [{"my_int": i, "my_str": "bar"} for i in range(size)]
+        nested = [{"my_model": payload} for payload in flat]
+
+        yield f"flat/init[{size}]", lambda payload: MyModel(**payload), flat
+        yield f"flat/model_validate[{size}]", MyModel.model_validate, flat
+        yield f"nested/init_instance[{size}]", lambda payload: TopModel(my_model=MyModel(**payload["my_model"])), nested
+        yield f"nested/init[{size}]", lambda payload: TopModel(**payload), nested
+        yield f"nested/model_validate[{size}]", TopModel.model_validate, nested
+
+
+if __name__ == "__main__":
+    raise SystemExit(
+        benchmark_main(
+            "Construction paths from models.py",
+            build_cases,
+            Path(__file__).with_suffix(".baseline.json"),
+        )
+    )
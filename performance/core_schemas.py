@@ -0,0 +1,24 @@
+from pydantic_core import CoreConfig, CoreSchema
+
+# Shared helpers for the modules in this folder that walk a model's core schema.
+# Nothing here touches pydantic internals or has import-time side effects.
+
+# the keys of a core schema node that hold other schema nodes, everything else (defaults, literal values,
+# config) is user data
+SCHEMA_KEYS = {
+    "schema", "items_schema", "keys_schema", "values_schema", "extras_schema", "json_schema", "python_schema",
+    "lax_schema", "strict_schema", "return_schema", "arguments_schema", "var_args_schema", "var_kwargs_schema",
+    "serialization", "steps", "definitions", "computed_fields", "fields", "choices",
+}
+NAMED_SCHEMA_KEYS = {"fields", "choices"}  # dicts of field name or union tag -> schema node
+
+
+def model_core_config(schema: CoreSchema) -> CoreConfig | None:
+    # the config pydantic hands to SchemaValidator is the one on the model's own schema node, which sits
+    # in the definitions of recursive models and inside the function schemas of model validators
+    if schema["type"] == "definitions":
+        ref = schema["schema"].get("schema_ref")
+        schema = next((node for node in schema["definitions"] if node.get("ref") == ref), schema["schema"])
+    while schema.get("type") != "model" and isinstance(schema.get("schema"), dict):
+        schema = schema["schema"]
+    return schema.get("config")
@@ -0,0 +1,170 @@
+import pprint
+import timeit
+from typing import Any, NoReturn, Self
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+
+# fields.py and config.py show that frozen=True only stops assigning to fields:
+# my_model.my_dict['a'] = 2 still succeeds, so a frozen model is not safe to use as a cache key.
+# DeepFrozenModel converts dict/list/set values into immutable, hashable versions while validating
+# and computes its hash once - the cached hash makes it cheap to use as a dict or memoization key.
+#
+# FrozenDict, FrozenList and FrozenSet subclass dict, list and set, so pydantic still serializes
+# them like the declared field types. Only exact dicts, lists, sets and tuples are frozen: subclasses such as
+# Counter or a NamedTuple keep their type, and stay as mutable as they were.
+
+
+def _immutable(self, *args, **kwargs) -> NoReturn:
+    raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+
+class FrozenDict(dict):
+    __slots__ = ("_hash",)
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FrozenList(list):
+    __slots__ = ("_hash",)
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(self))
+            return self._hash
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+class FrozenSet(set):
+    __slots__ = ("_hash",)
+    __isub__ = __iand__ = __ixor__ = __ior__ = _immutable
+    add = clear = discard = pop = remove = update = _immutable
+    difference_update = intersection_update = symmetric_difference_update = _immutable
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self))
+            return self._hash
+
+    def __reduce__(self):
+        return type(self), (set(self),)
+
+
+def deep_freeze(value: Any) -> Any:
+    # only the exact builtin containers are rebuilt: a subclass (a Counter, a NamedTuple, FrozenDict itself)
+    # would lose its type and attributes, so it is kept as it is
+    value_type = type(value)
+    if value_type is dict:
+        return FrozenDict({key: deep_freeze(item) for key, item in value.items()})
+    if value_type is list:
+        return FrozenList(deep_freeze(item) for item in value)
+    if value_type is set:
+        return FrozenSet(deep_freeze(item) for item in value)
+    if value_type is tuple:
+        return tuple(deep_freeze(item) for item in value)
+    return value
+
+
+class DeepFrozenModel(BaseModel):
+    # a slot instead of a private attribute: private attributes take part in __eq__,
+    # so a cached hash stored there would make a hashed and an unhashed copy unequal
+    __slots__ = ("_cached_hash",)
+    model_config = ConfigDict(frozen=True)
+
+    @model_validator(mode="after")
+    def _deep_freeze(self) -> Self:
+        # one call per instance, nested models are left alone - make them DeepFrozenModels too
+        values = self.__dict__
+        for name, value in values.items():
+            if type(value) in (dict, list, set, tuple):
+                values[name] = deep_freeze(value)
+        return self
+
+    def model_copy(self, *, update: dict[str, Any] | None = None, deep: bool = False) -> Self:
+        # model_copy does not validate, so the updated values are frozen here
+        if update:
+            update = {name: deep_freeze(value) for name, value in update.items()}
+        return super().model_copy(update=update, deep=deep)
+
+    def __hash__(self) -> int:
+        try:
+            return self._cached_hash
+        except AttributeError:
+            cached_hash = hash((self.__class__, *self.__dict__.values()))
+            object.__setattr__(self, "_cached_hash", cached_hash)
+            return cached_hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        # two different cached hashes can never belong to equal models
+        if (
+            isinstance(other, DeepFrozenModel)
+            and hasattr(self, "_cached_hash")
+            and hasattr(other, "_cached_hash")
+            and self._cached_hash != other._cached_hash
+        ):
+            return False
+        return super().__eq__(other)
+
+
+if __name__ == "__main__":
+
+    print("--- Deep frozen model ---")
+
+    class MyModel(DeepFrozenModel):
+        my_dict: dict
+        my_list: list[int] = Field(default_factory=list)
+        my_str: str
+
+    external_data = {"my_dict": {"a": 1, "b": [1, 2]}, "my_str": "foo"}
+    my_model = MyModel(**external_data)
+
+    try:
+        my_model.my_dict["a"] = 2
+    except TypeError as e:
+        print(e)  # 'FrozenDict' object is immutable
+
+    try:
+        my_model.my_dict["b"].append(3)
+    except TypeError as e:
+        print(e)  # 'FrozenList' object is immutable
+
+    try:
+        my_model.my_str = "bar"
+    except ValidationError as e:
+        pprint.pp(e.errors())  # Instance is frozen
+
+    print(my_model.model_dump())  # {'my_dict': {'a': 1, 'b': [1, 2]}, 'my_list': [], 'my_str': 'foo'}
+
+    print("\n--- Frozen models as cache keys ---")
+    cache = {my_model: "cached result"}
+    print(cache[MyModel(**external_data)])  # cached result
+
+    class MyFrozenModel(BaseModel):
+        model_config = ConfigDict(frozen=True)
+
+        my_tuple: tuple[int, ...]
+        my_str: str
+
+    wide_data = {"my_tuple": tuple(range(1_000)), "my_str": "foo"}
+    frozen_model = MyFrozenModel(**wide_data)
+    deep_frozen_model = MyModel(my_dict={}, my_list=list(range(1_000)), my_str="foo")
+    print(f"frozen=True hash:    {timeit.timeit(lambda: hash(frozen_model), number=100_000):.3f}s")
+    print(f"DeepFrozenModel hash: {timeit.timeit(lambda: hash(deep_frozen_model), number=100_000):.3f}s")
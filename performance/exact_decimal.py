@@ -0,0 +1,271 @@
+import json
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable
+
+from pydantic import BaseModel, Field, ValidationError
+
+from benchmark import measure, print_header, print_results
+from fixed_point import FixedPointDecimal
+
+# parsing_strict_mode.py accepts my_number=12.35 for a Decimal field. From JSON, pydantic parses 12.35 as a
+# float first and builds the Decimal from that float, so digits beyond float precision are lost:
+# {"my_number": 12345678901234567.89} validates to Decimal('12345678901234568').
+# validate_json_exact parses the JSON numbers straight from their digits with json.loads(parse_float=Decimal)
+# and validates the result in Python mode, so the Decimal fields get the exact value.
+#
+#     validate_json_exact(MyModel, b'{"my_number": 12345678901234567.89}')  # Decimal('12345678901234567.89')
+#
+# or as a base model, for model_validate_json:
+#
+#     class MyModel(ExactDecimalModel):
+#         my_number: Decimal
+#
+# Only models with a Decimal field anywhere in their schema take this path, FixedPointDecimal fields
+# included. Float fields still get floats, lax mode converts the Decimal back. Untyped values (dict, Any)
+# and before/wrap/plain validators would see the Decimal too, and model_dump would hand it on, so for models
+# with such parts the parsed data is walked along the core schema once and every JSON number outside a
+# Decimal field is turned back into the float pydantic would have parsed. Where a union or a custom
+# validator mixes Decimal with other types the numbers stay Decimal.
+# Models with any strict part keep model_validate_json, whether strict is set on the call, the config or a
+# single Field(strict=True), nested models included: strict Python mode rejects JSON strings for e.g.
+# datetime and UUID fields. So do models with a part that validates JSON differently from Python
+# (a json-or-python schema, e.g. Path or FixedPointUnits, which reads JSON ints as scaled ints) - except in
+# the strict branch of a lax-or-strict schema, which lax validation never takes.
+# Validators see info.mode == "python".
+
+
+UNTYPED_SCHEMAS = {"any", "function-before", "function-wrap", "function-plain"}  # get the parsed JSON value as is
+STRUCTURED_SCHEMAS = {"list", "set", "frozenset", "tuple", "dict", "model-fields", "typed-dict", "dataclass-args"}
+Converter = Callable[[Any], Any]
+
+
+def _schema_has(schema: Any, predicate: Callable[[dict], bool], skip: frozenset = frozenset({"metadata"})) -> bool:
+    if isinstance(schema, dict):
+        return predicate(schema) or any(
+            _schema_has(value, predicate, skip) for key, value in schema.items() if key not in skip
+        )
+    if isinstance(schema, list):
+        return any(_schema_has(value, predicate, skip) for value in schema)
+    return False
+
+
+@lru_cache(maxsize=None)
+def has_decimal_fields(model: type[BaseModel]) -> bool:
+    return _schema_has(model.__pydantic_core_schema__, lambda schema: schema.get("type") == "decimal")
+
+
+def _json_mode_only(schema: dict) -> bool:
+    # schema nodes and core configs both carry "strict", the configs of nested models included
+    return schema.get("strict") is True or schema.get("type") == "json-or-python"
+
+
+@lru_cache(maxsize=None)
+def needs_json_mode(model: type[BaseModel]) -> bool:
+    return _schema_has(model.__pydantic_core_schema__, _json_mode_only, frozenset({"metadata", "strict_schema"}))
+
+
+def _floats(value: Any) -> Any:
+    # the JSON numbers parsed as Decimal back to the floats pydantic's JSON parser gives
+    if type(value) is Decimal:
+        return float(value)
+    if type(value) is dict:
+        return {key: _floats(item) for key, item in value.items()}
+    if type(value) is list:
+        return [_floats(item) for item in value]
+    return value
+
+
+def _keep(value: Any) -> Any:
+    return value
+
+
+class _FloatConverter:
+    """Compile a core schema into a function that turns the Decimals outside Decimal fields back into floats."""
+
+    def __init__(self, schema: dict):
+        self.definitions: dict[str, dict] = {}
+        self.compiled: dict[str, Converter] = {}
+        self.has_decimal: dict[int, bool] = {}
+        self.convert = self.compile(schema)
+
+    def resolve(self, schema: dict) -> dict:
+        if schema["type"] == "definitions":
+            self.definitions.update((definition["ref"], definition) for definition in schema["definitions"])
+            return self.resolve(schema["schema"])
+        return schema
+
+    def contains_decimal(self, schema: Any) -> bool:
+        # like has_decimal_fields, following definition references once
+        if isinstance(schema, list):
+            return any(self.contains_decimal(item) for item in schema)
+        if not isinstance(schema, dict):
+            return False
+        key = id(schema)
+        if key not in self.has_decimal:
+            self.has_decimal[key] = False  # a reference cycle without a decimal in it
+            if schema.get("type") == "definition-ref":
+                found = self.contains_decimal(self.definitions[schema["schema_ref"]])
+            else:
+                found = schema.get("type") == "decimal" or any(
+                    self.contains_decimal(value) for name, value in schema.items() if name != "metadata"
+                )
+            self.has_decimal[key] = found
+        return self.has_decimal[key]
+
+    def compile(self, schema: dict) -> Converter:
+        schema = self.resolve(schema)
+        if schema["type"] == "definition-ref":
+            ref = schema["schema_ref"]
+            if ref not in self.compiled:
+                self.compiled[ref] = _keep  # replaced below, recursive models look it up at call time
+                self.compiled[ref] = self.compile(self.definitions[ref])
+            return lambda value: self.compiled[ref](value)
+        if not self.contains_decimal(schema):
+            return _floats
+        if schema["type"] in ("model", "dataclass", "default", "nullable"):
+            return self.compile(schema["schema"])
+        if schema["type"] in STRUCTURED_SCHEMAS:
+            return self.compile_structured(schema)
+        return _keep  # the Decimal field itself, or a union or custom validator with a Decimal in it
+
+    def compile_structured(self, schema: dict) -> Converter:
+        if schema["type"] in ("list", "set", "frozenset"):
+            items = self.compile(schema["items_schema"]) if "items_schema" in schema else _floats
+            return lambda value: [items(item) for item in value] if type(value) is list else value
+        if schema["type"] == "tuple":
+            positions = [self.compile(item) for item in schema["items_schema"]]
+            variadic = schema.get("variadic_item_index")
+
+            def convert_tuple(value: Any) -> Any:
+                # tuple[float, Decimal] item by item, tuple[Decimal, ...] repeats its variadic item
+                if type(value) is not list:
+                    return value
+                last = len(positions) - 1 if variadic is None else variadic
+                return [
+                    positions[min(index, last)](item) if index <= last or variadic is not None else item
+                    for index, item in enumerate(value)
+                ]
+
+            return convert_tuple
+        if schema["type"] == "dict":
+            values = self.compile(schema["values_schema"]) if "values_schema" in schema else _floats
+            return lambda value: {key: values(item) for key, item in value.items()} if type(value) is dict else value
+
+        # model-fields, typed-dict and dataclass-args: the converter of every key that can set a field,
+        # extras get the extras schema or, untyped, floats
+        fields = schema["fields"]
+        items = fields.items() if isinstance(fields, dict) else ((field["name"], field) for field in fields)
+        by_key = {}
+        for name, field in items:
+            convert = self.compile(field["schema"])
+            alias = field.get("validation_alias")
+            paths = [[alias]] if isinstance(alias, str) else alias or []
+            for key in (name, *(path[0] for path in paths)):
+                by_key[key] = convert
+            for path in paths:
+                if len(path) > 1:
+                    by_key[path[0]] = _keep  # an AliasPath, the value is nested - left to the field
+        extras = self.compile(schema["extras_schema"]) if "extras_schema" in schema else _floats
+        return lambda value: (
+            {key: by_key.get(key, extras)(item) for key, item in value.items()} if type(value) is dict else value
+        )
+
+
+@lru_cache(maxsize=None)
+def json_floats(model: type[BaseModel]) -> Converter | None:
+    """The converter that gives untyped parts of the model floats again, None when no part needs one."""
+    schema = model.__pydantic_core_schema__
+    if not _schema_has(schema, lambda node: node.get("type") in UNTYPED_SCHEMAS):
+        return None
+    return _FloatConverter(schema).convert
+
+
+def validate_json_exact(model: type[BaseModel], json_data: str | bytes | bytearray, **kwargs: Any) -> Any:
+    """model_validate_json, with JSON numbers parsed as exact Decimals for models with Decimal fields."""
+    if not has_decimal_fields(model) or kwargs.get("strict") or needs_json_mode(model):
+        return model.__pydantic_validator__.validate_json(json_data, **kwargs)
+    try:
+        data = json.loads(json_data, parse_float=Decimal)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValidationError.from_exception_data(
+            model.__name__, [{"type": "json_invalid", "loc": (), "input": json_data, "ctx": {"error": str(e)}}]
+        ) from None
+    convert = json_floats(model)
+    if convert is not None:
+        data = convert(data)
+    return model.__pydantic_validator__.validate_python(data, **kwargs)
+
+
+class ExactDecimalModel(BaseModel):
+    @classmethod
+    def model_validate_json(cls, json_data: str | bytes | bytearray, **kwargs: Any) -> Any:
+        return validate_json_exact(cls, json_data, **kwargs)
+
+
+if __name__ == "__main__":
+
+    print("--- Exact Decimal from JSON ---")
+
+    class MyModel(BaseModel):
+        my_number: Decimal
+
+    class MyExactModel(ExactDecimalModel):
+        my_number: Decimal
+
+    json_data = b'{"my_number": 12345678901234567.89}'
+    print(MyModel.model_validate_json(json_data))  # my_number=Decimal('12345678901234568')
+    print(MyExactModel.model_validate_json(json_data))  # my_number=Decimal('12345678901234567.89')
+    class MyExactAnyModel(ExactDecimalModel):
+        my_number: Decimal
+        my_details: dict[str, Any]
+
+    print(MyExactAnyModel.model_validate_json(b'{"my_number": 1.10, "my_details": {"my_float": 0.1}}'))
+    # my_number=Decimal('1.10') my_details={'my_float': 0.1} - untyped values still get floats
+
+    try:
+        MyExactModel.model_validate_json(b'{"my_number": 12.3')
+    except ValidationError as e:
+        print(e.errors())  # Invalid JSON: Expecting ',' delimiter
+
+    print("\n--- Benchmark: orders of 10 line items with 3 prices each ---")
+
+    class MyItem(BaseModel):
+        my_sku: str
+        my_quantity: int
+        my_price: Decimal
+        my_tax: Decimal
+        my_discount: Decimal
+
+    class MyOrder(BaseModel):
+        my_id: int
+        my_items: list[MyItem]
+
+    class MyFixedItem(BaseModel):
+        my_sku: str
+        my_quantity: int
+        my_price: FixedPointDecimal = Field(decimal_places=2)
+        my_tax: FixedPointDecimal = Field(decimal_places=2)
+        my_discount: FixedPointDecimal = Field(decimal_places=2)
+
+    class MyFixedOrder(BaseModel):
+        my_id: int
+        my_items: list[MyFixedItem]
+
+    orders = [
+        json.dumps({
+            "my_id": order,
+            "my_items": [
+                {"my_sku": f"S{i}", "my_quantity": i, "my_price": i + 0.99, "my_tax": round(i * 0.2, 2), "my_discount": 0.5}
+                for i in range(10)
+            ],
+        }).encode()
+        for order in range(1_000)
+    ]
+    print_header()
+    print_results([
+        measure("model_validate_json, Decimal", MyOrder.model_validate_json, orders),
+        measure("validate_json_exact, Decimal", lambda data: validate_json_exact(MyOrder, data), orders),
+        measure("model_validate_json, FixedPointDecimal", MyFixedOrder.model_validate_json, orders),
+        measure("validate_json_exact, FixedPointDecimal", lambda data: validate_json_exact(MyFixedOrder, data), orders),
+    ])
@@ -0,0 +1,439 @@
+import operator
+import re
+import timeit
+from decimal import Decimal, InvalidOperation
+from functools import total_ordering
+from typing import Annotated, Any, Callable, Iterable
+
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, GetJsonSchemaHandler, ValidationError
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import PydanticCustomError, core_schema
+
+from benchmark import measure, print_header, print_results
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, it is only needed for the column helpers
+    np = None
+
+# fields.py declares my_decimal: Decimal = Field(decimal_places=2), so every instance holds a decimal.Decimal.
+# Decimal arithmetic and allocation are slow, while a price with 2 decimal places is really an
+# integer number of cents. FixedPointDecimal keeps the Field constraints and stores the value as a
+# FixedDecimal - an int scaled by 10 ** decimal_places - with arithmetic, comparisons and JSON dump,
+# and FixedDecimal.to_decimal() gives back the exact Decimal. Mixing a FixedDecimal with a Decimal in
+# +, - or * gives a Decimal, and so does every division. Comparisons, bool() and hash() behave like the
+# same Decimal, also against floats: FixedDecimal('1.50') == 1.5.
+#
+# The fast paths are fixed_sum() and the numpy helpers only, per-value arithmetic is slower than Decimal.
+# FixedDecimal is written in Python while Decimal is implemented in C, so a * b + c on single values and
+# model_dump_json are about 2x and 1.6x slower than with Decimal in the benchmark below.
+# The helpers work on the scaled ints directly: fixed_sum(prices, 2) is a plain int sum, and units_array()
+# turns a column of values into an int64 array for numpy, with multiply_units() for FixedDecimal's
+# rounding, so a * b + c over a whole column is about 2.5x faster than with Decimal.
+# FixedPointUnits dumps the scaled int itself (2345 for 23.45) through a plain int serializer, which is
+# faster than dumping Decimal, and reads JSON ints back as scaled ints - the JSON format changes, so only
+# use it when the consumer knows the decimal places. Keep Decimal for fields used in per-value arithmetic.
+#
+#     my_decimal: FixedPointDecimal = Field(decimal_places=2, max_digits=12)
+#     my_price: FixedPointUnits = Field(decimal_places=2)  # {"my_price": 2345}
+#
+# Plain integer and decimal string inputs ("12.34") and Decimals that fit are converted straight into the
+# scaled int, and the gt/ge/lt/le/multiple_of constraints are checked on that int. Everything else (floats,
+# exponent strings, out of range values) goes through pydantic's Decimal validation first, and so does every
+# input in strict mode, whether it is set on the Field, in the model config or on the model_validate call.
+# The scaled int is kept within the int64 range, so max_digits can be at most 18.
+
+INT64_MAX = 2**63 - 1
+DECIMAL_STRING = re.compile(r"^\s*([+-]?)(\d+)(?:\.(\d*))?\s*$")
+
+
+@total_ordering
+class FixedDecimal:
+    __slots__ = ("units", "places")
+
+    def __init__(self, units: int, places: int):
+        if not -INT64_MAX <= units <= INT64_MAX:
+            raise OverflowError(f"{units} does not fit in int64")
+        self.units = units
+        self.places = places
+
+    @classmethod
+    def from_decimal(cls, value: Decimal, places: int) -> "FixedDecimal":
+        return cls(int(value.scaleb(places)), places)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.units).scaleb(-self.places)
+
+    def _align(self, other: Any) -> tuple[int, int, int]:
+        # returns both values as units of the same scale, plus that scale
+        if isinstance(other, FixedDecimal):
+            if other.places == self.places:
+                return self.units, other.units, self.places
+            places = max(self.places, other.places)
+            return (
+                self.units * 10 ** (places - self.places),
+                other.units * 10 ** (places - other.places),
+                places,
+            )
+        if isinstance(other, int):
+            return self.units, other * 10**self.places, self.places
+        return NotImplemented
+
+    def __add__(self, other: Any) -> "FixedDecimal | Decimal":
+        if type(other) is FixedDecimal and other.places == self.places:
+            return FixedDecimal(self.units + other.units, self.places)
+        if isinstance(other, Decimal):
+            return self.to_decimal() + other
+        aligned = self._align(other)
+        if aligned is NotImplemented:
+            return NotImplemented
+        left, right, places = aligned
+        return FixedDecimal(left + right, places)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> "FixedDecimal | Decimal":
+        if type(other) is FixedDecimal and other.places == self.places:
+            return FixedDecimal(self.units - other.units, self.places)
+        if isinstance(other, Decimal):
+            return self.to_decimal() - other
+        aligned = self._align(other)
+        if aligned is NotImplemented:
+            return NotImplemented
+        left, right, places = aligned
+        return FixedDecimal(left - right, places)
+
+    def __rsub__(self, other: Any) -> "FixedDecimal | Decimal":
+        result = self - other
+        return result if result is NotImplemented else -result
+
+    def __mul__(self, other: Any) -> "FixedDecimal | Decimal":
+        if isinstance(other, int):
+            return FixedDecimal(self.units * other, self.places)
+        if isinstance(other, FixedDecimal):
+            # rounds half to even back to this value's decimal places, like Decimal.quantize
+            quotient, remainder = divmod(self.units * other.units, 10**other.places)
+            half = 10**other.places
+            if 2 * remainder > half or (2 * remainder == half and quotient % 2):
+                quotient += 1
+            return FixedDecimal(quotient, self.places)
+        if isinstance(other, Decimal):
+            return self.to_decimal() * other
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> Decimal:
+        # the quotient has no fixed number of decimal places, so it is a Decimal like Decimal / Decimal
+        if isinstance(other, FixedDecimal):
+            other = other.to_decimal()
+        if isinstance(other, (int, Decimal)):
+            return self.to_decimal() / other
+        return NotImplemented
+
+    def __rtruediv__(self, other: Any) -> Decimal:
+        if isinstance(other, (int, Decimal)):
+            return other / self.to_decimal()
+        return NotImplemented
+
+    def __neg__(self) -> "FixedDecimal":
+        return FixedDecimal(-self.units, self.places)
+
+    def __abs__(self) -> "FixedDecimal":
+        return FixedDecimal(abs(self.units), self.places)
+
+    def __bool__(self) -> bool:
+        return self.units != 0
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is FixedDecimal and other.places == self.places:
+            return self.units == other.units
+        if isinstance(other, (Decimal, float)):
+            return self.to_decimal() == other
+        aligned = self._align(other)
+        return aligned is not NotImplemented and aligned[0] == aligned[1]
+
+    def __lt__(self, other: Any) -> bool:
+        if type(other) is FixedDecimal and other.places == self.places:
+            return self.units < other.units
+        if isinstance(other, (Decimal, float)):
+            return self.to_decimal() < other
+        aligned = self._align(other)
+        if aligned is NotImplemented:
+            return NotImplemented
+        return aligned[0] < aligned[1]
+
+    def __hash__(self) -> int:
+        # equal to the hash of the same Decimal (and of an equal int or float), so they work as the same dict key
+        return hash(self.to_decimal())
+
+    def __str__(self) -> str:
+        places = self.places
+        if not places:
+            return str(self.units)
+        # string slicing is about twice as fast as divmod plus a format spec, it matters for model_dump_json
+        if self.units < 0:
+            digits = str(-self.units).rjust(places + 1, "0")
+            return f"-{digits[:-places]}.{digits[-places:]}"
+        digits = str(self.units).rjust(places + 1, "0")
+        return f"{digits[:-places]}.{digits[-places:]}"
+
+    def __repr__(self) -> str:
+        return f"FixedDecimal('{self}')"
+
+
+class FixedPoint:
+    """Annotated marker that stores a constrained Decimal field as a FixedDecimal.
+
+    json_units=True dumps the scaled int to JSON and reads JSON ints as scaled ints.
+    """
+
+    def __init__(self, json_units: bool = False):
+        self.json_units = json_units
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        # handler(source) is the Decimal schema with the Field constraints already applied
+        decimal_schema = handler(source)
+        places = decimal_schema.get("decimal_places")
+        max_digits = decimal_schema.get("max_digits")
+        if places is None:
+            raise TypeError("FixedPoint needs Field(decimal_places=...)")
+        if max_digits is not None and max_digits > 18:
+            raise TypeError("FixedPoint stores an int64, so max_digits can be at most 18")
+        max_whole_digits = max_digits - places if max_digits is not None else 18 - places
+        scale = 10**places
+        fits = _scaled_constraints(decimal_schema, places)
+
+        def validate(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> FixedDecimal:
+            # the fast paths only return values that meet the other Field constraints too (gt, le, multiple_of...),
+            # anything else goes to the Decimal schema below, which raises pydantic's own error
+            if fits is None:
+                pass
+            elif type(value) is int and abs(value) < 10**max_whole_digits:
+                if fits(units := value * scale):
+                    return FixedDecimal(units, places)
+            elif type(value) is str and (match := DECIMAL_STRING.match(value)):
+                sign, whole, fraction = match.groups()
+                fraction = (fraction or "").rstrip("0")
+                whole = whole.lstrip("0")
+                if len(fraction) <= places and len(whole) <= max_whole_digits:
+                    units = int(whole + fraction.ljust(places, "0") or "0")
+                    if fits(units := -units if sign == "-" else units):
+                        return FixedDecimal(units, places)
+            elif type(value) is Decimal and value.is_finite():
+                # e.g. from validate_json_exact (exact_decimal.py), JSON numbers parsed as Decimal
+                _, digits, exponent = value.as_tuple()
+                if -places <= exponent and len(digits) + exponent <= max_whole_digits:
+                    if fits(units := int(value.scaleb(places))):
+                        return FixedDecimal(units, places)
+            # anything else, including invalid strings, gets pydantic's own validation and errors
+            try:
+                return FixedDecimal.from_decimal(handler(value), places)
+            except OverflowError as e:
+                raise ValueError(str(e)) from e
+
+        def validate_strict(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> FixedDecimal:
+            # strict Python input has to be a Decimal already, the handler rejects str and int with pydantic's error
+            if type(value) is Decimal:
+                return validate(value, handler)
+            try:
+                return FixedDecimal.from_decimal(handler(value), places)
+            except OverflowError as e:
+                raise ValueError(str(e)) from e
+
+        def validate_strict_json(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> FixedDecimal:
+            # strict JSON still takes numbers and numeric strings for a Decimal, but the handler gets them as
+            # Python objects, where strict mode only takes a Decimal, so they are turned into one first
+            return validate_strict(_json_decimal(value), handler)
+
+        # lax_or_strict_schema picks the strict branch for Field(strict=True), ConfigDict(strict=True) and
+        # model_validate(..., strict=True) alike, so strict Python input never takes the str and int fast paths
+        strict = decimal_schema.get("strict")
+        schema = core_schema.lax_or_strict_schema(
+            lax_schema=core_schema.no_info_wrap_validator_function(validate, decimal_schema),
+            strict_schema=core_schema.json_or_python_schema(
+                json_schema=core_schema.no_info_wrap_validator_function(validate_strict_json, decimal_schema),
+                python_schema=core_schema.no_info_wrap_validator_function(validate_strict, decimal_schema),
+            ),
+            strict=strict,
+            serialization=core_schema.plain_serializer_function_ser_schema(serialize, info_arg=True),
+        )
+        if not self.json_units:
+            return schema
+
+        def validate_units(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> FixedDecimal:
+            if type(value) is int:
+                if fits is not None and abs(value) < 10 ** (max_whole_digits + places) and fits(value):
+                    return FixedDecimal(value, places)
+                value = Decimal(value).scaleb(-places)  # pydantic's own errors, for the value the units stand for
+            return validate(value, handler)
+
+        def validate_units_strict(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> FixedDecimal:
+            if type(value) is int:
+                value = Decimal(value).scaleb(-places)
+            return validate_strict_json(value, handler)
+
+        # Python mode keeps the FixedDecimal schema and its serializer, JSON gets the scaled int both ways
+        return core_schema.json_or_python_schema(
+            json_schema=core_schema.lax_or_strict_schema(
+                lax_schema=core_schema.no_info_wrap_validator_function(validate_units, decimal_schema),
+                strict_schema=core_schema.no_info_wrap_validator_function(validate_units_strict, decimal_schema),
+                strict=strict,
+            ),
+            python_schema=schema,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _units, return_schema=core_schema.int_schema(), when_used="json"
+            ),
+        )
+
+    def __get_pydantic_json_schema__(
+        self, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        return {"type": "integer"} if self.json_units else handler(schema)
+
+
+def _scaled_constraints(decimal_schema: core_schema.DecimalSchema, places: int) -> Callable[[int], bool] | None:
+    # a check of the gt/ge/lt/le/multiple_of constraints on the scaled int, None if the fast paths must not be used
+    multiple = decimal_schema.get("multiple_of")
+    if multiple is not None:
+        multiple = Decimal(multiple).scaleb(places)
+    if multiple is not None and multiple % 1:
+        return None  # a multiple_of below 10 ** -places is left to pydantic
+    bounds = [
+        (compare, Decimal(decimal_schema[key]).scaleb(places))
+        for key, compare in (("gt", operator.gt), ("ge", operator.ge), ("lt", operator.lt), ("le", operator.le))
+        if decimal_schema.get(key) is not None
+    ]
+    multiple = int(multiple) if multiple is not None else None
+    if not bounds and not multiple:
+        return lambda units: True
+    return lambda units: all(compare(units, bound) for compare, bound in bounds) and (not multiple or units % multiple == 0)
+
+
+def _json_decimal(value: Any) -> Any:
+    # a JSON number or string as a Decimal, anything else is left to the handler for pydantic's error
+    if type(value) in (int, float, str):
+        try:
+            return Decimal(str(value).strip())
+        except InvalidOperation:
+            raise PydanticCustomError("decimal_parsing", "Input should be a valid decimal") from None
+    return value
+
+
+def fixed_sum(values: Iterable[FixedDecimal], places: int) -> FixedDecimal:
+    """Sum values with the same decimal places as plain ints - the fast path for totals."""
+    return FixedDecimal(sum(value.units for value in values), places)
+
+
+def units_array(values: Iterable[FixedDecimal]) -> "np.ndarray":
+    """The scaled ints of values with the same decimal places as an int64 array, for numpy arithmetic."""
+    if np is None:
+        raise ImportError("units_array requires numpy, install it with `pip install numpy`")
+    return np.fromiter((value.units for value in values), dtype=np.int64)
+
+
+def multiply_units(units: "np.ndarray", factor: FixedDecimal) -> "np.ndarray":
+    """FixedDecimal * factor for a whole units_array, rounded half to even back to the same decimal places."""
+    if int(np.abs(units).max(initial=0)) * abs(factor.units) > INT64_MAX:
+        raise OverflowError(f"units * {factor.units} does not fit in int64")
+    scale = 10**factor.places
+    quotient, remainder = np.divmod(units * factor.units, scale)
+    return quotient + ((2 * remainder > scale) | ((2 * remainder == scale) & (quotient % 2 == 1)))
+
+
+def serialize(value: FixedDecimal, info: core_schema.SerializationInfo) -> FixedDecimal | str:
+    # like Decimal, a FixedDecimal is dumped as a string in JSON
+    return str(value) if info.mode_is_json() else value
+
+
+_units = operator.attrgetter("units")
+
+FixedPointDecimal = Annotated[Decimal, FixedPoint()]
+FixedPointUnits = Annotated[Decimal, FixedPoint(json_units=True)]
+
+
+if __name__ == "__main__":
+
+    print("--- Fixed point decimals ---")
+
+    class MyModel(BaseModel):
+        my_int: int
+        my_decimal: FixedPointDecimal = Field(decimal_places=2)
+
+    my_model = MyModel(my_int=45, my_decimal="23.45")
+    print(my_model)  # my_int=45 my_decimal=FixedDecimal('23.45')
+    print(my_model.my_decimal * 3 + 1)  # 71.35
+    print(my_model.my_decimal.to_decimal())  # 23.45
+    print(Decimal("100") - my_model.my_decimal)  # 76.55, mixed with a Decimal the result is a Decimal
+    print(my_model.model_dump_json())  # {"my_int":45,"my_decimal":"23.45"}
+    print(bool(FixedDecimal(0, 2)), FixedDecimal(150, 2) == 1.5, my_model.my_decimal / 5)  # False True 4.69
+
+    try:
+        MyModel(my_int=45, my_decimal=Decimal("23.455"))
+    except ValidationError as e:
+        print(e.errors())  # Decimal input should have no more than 2 decimal places
+
+    class MyUnitsModel(BaseModel):
+        my_price: FixedPointUnits = Field(decimal_places=2)
+
+    print(MyUnitsModel(my_price="23.45").model_dump_json())  # {"my_price":2345}
+    print(MyUnitsModel.model_validate_json('{"my_price": 2345}'))  # my_price=FixedDecimal('23.45')
+
+    prices = [FixedDecimal(2345, 2), FixedDecimal(-1005, 2), FixedDecimal(1, 2)]
+    units = units_array(prices)
+    print(multiply_units(units, FixedDecimal(150, 2)) + units)  # [ 5863 -2513     3]
+
+    print("\n--- Benchmark ---")
+
+    class MyDecimalModel(BaseModel):
+        my_int: int
+        my_decimal: Decimal = Field(decimal_places=2)
+
+    payloads = [{"my_int": i, "my_decimal": f"{i}.{i % 100:02d}"} for i in range(1_000)]
+    decimal_models = [MyDecimalModel(**payload) for payload in payloads]
+    fixed_models = [MyModel(**payload) for payload in payloads]
+
+    class MyFixedUnitsModel(BaseModel):
+        my_int: int
+        my_decimal: FixedPointUnits = Field(decimal_places=2)
+
+    units_models = [MyFixedUnitsModel(**payload) for payload in payloads]
+    quantity_decimal = Decimal("1.5")
+    quantity_fixed = FixedDecimal(150, 2)
+
+    print_header()
+    print_results([
+        measure("validate Decimal", MyDecimalModel.model_validate, payloads),
+        measure("validate FixedPointDecimal", MyModel.model_validate, payloads),
+        measure("dump_json Decimal", MyDecimalModel.model_dump_json, decimal_models),
+        measure("dump_json FixedPointDecimal", MyModel.model_dump_json, fixed_models),
+        measure("dump_json FixedPointUnits", MyFixedUnitsModel.model_dump_json, units_models),
+        measure("sum Decimal", lambda models: sum(model.my_decimal for model in models), [decimal_models]),
+        measure("sum FixedPointDecimal", lambda models: fixed_sum((model.my_decimal for model in models), 2), [fixed_models]),
+        measure(
+            "price * quantity + total Decimal",
+            lambda model: (model.my_decimal * quantity_decimal).quantize(Decimal("0.01")) + model.my_decimal,
+            decimal_models,
+        ),
+        measure(
+            "price * quantity + total FixedPointDecimal",
+            lambda model: model.my_decimal * quantity_fixed + model.my_decimal,
+            fixed_models,
+        ),
+    ])
+
+    print("\n--- Benchmark: price * quantity + total over 1000 models ---")
+
+    def per_decimal() -> list[Decimal]:
+        cent = Decimal("0.01")
+        return [(model.my_decimal * quantity_decimal).quantize(cent) + model.my_decimal for model in decimal_models]
+
+    def per_column() -> "np.ndarray":
+        units = units_array(model.my_decimal for model in fixed_models)
+        return multiply_units(units, quantity_fixed) + units
+
+    def ms(func: Any) -> float:
+        return min(timeit.repeat(func, number=20, repeat=5)) / 20 * 1_000
+
+    print(f"Decimal, value by value: {ms(per_decimal):.3f} ms")
+    print(f"units_array + multiply_units: {ms(per_column):.3f} ms")
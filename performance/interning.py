@@ -0,0 +1,264 @@
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, ClassVar, Hashable
+from weakref import WeakValueDictionary
+
+from pydantic import BaseModel, ConfigDict, ValidationInfo, model_validator
+from pydantic_core.core_schema import ValidatorFunctionWrapHandler
+
+from benchmark import measure, print_header, print_results
+from deep_frozen import DeepFrozenModel
+
+# A feed repeats the same small frozen reference objects (tariff codes, region records) millions of times,
+# and every record validates into a new instance. InternedModel keeps an intern table per model: validating
+# an input equal to one seen before returns the existing instance, like sys.intern for strings.
+#
+#     class MyTariff(InternedModel):
+#         my_code: str
+#         my_region: str
+#
+#     MyTariff.model_validate(record) is MyTariff.model_validate(dict(record))  # True
+#
+# Inputs are looked up by their raw dict first, so a hit skips validation entirely. An input that is
+# spelled differently but validates to an equal instance ("1" and 1 for an int field) is found by the
+# validated values. Interning works through model_validate, model_validate_json and nested fields.
+# MyTariff(...) always creates a new instance, __init__ validates into the instance it is called on.
+#
+# InternedModel is a DeepFrozenModel, so dict and list fields are frozen and the instances are safe to
+# share. == is an identity check first and compares the cached hashes next, so most comparisons never
+# look at the field values. Two distinct equal instances still compare equal, e.g. after an entry was
+# evicted from the table and its input was interned again.
+# The table is a bounded LRU of intern_maxsize instances by default (the raw inputs get an LRU of the same
+# size), with intern_weak = True it only keeps the instances that are still used elsewhere.
+# A raw input is only remembered if every field kept the exact type it arrived with, so a hit never skips
+# a coercion that strict=True would have rejected. Validation with a context does not use the table at all,
+# validators may depend on the context.
+
+_initializing: ContextVar[bool] = ContextVar("_initializing", default=False)
+
+
+@dataclass
+class InternStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class InternTable:
+    """The interned instances by their validated values, and the raw inputs that validated into them.
+
+    Instances and inputs are separate LRUs of maxsize entries each, so maxsize instances are kept
+    however many spellings of their inputs were seen.
+    """
+
+    def __init__(self, maxsize: int = 100_000, weak: bool = False):
+        self.maxsize = maxsize
+        self.weak = weak
+        self.instances = self._new_entries()
+        self.inputs = self._new_entries()
+        self.stats = InternStats()
+        self._lock = Lock()  # an add, its check for an earlier instance and its eviction happen together
+
+    def _new_entries(self) -> OrderedDict[Hashable, Any] | WeakValueDictionary[Hashable, Any]:
+        return WeakValueDictionary() if self.weak else OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        return self._get(self.instances, key)
+
+    def add(self, key: Hashable, instance: Any) -> Any:
+        """Add instance unless the key is taken, and return the instance kept under the key."""
+        return self._add(self.instances, key, instance)
+
+    def get_input(self, key: Hashable) -> Any:
+        return self._get(self.inputs, key)
+
+    def add_input(self, key: Hashable, instance: Any) -> Any:
+        return self._add(self.inputs, key, instance)
+
+    def _get(self, entries: OrderedDict | WeakValueDictionary, key: Hashable) -> Any:
+        instance = entries.get(key)
+        if instance is not None and not self.weak:
+            try:
+                entries.move_to_end(key)
+            except KeyError:  # evicted by another thread since the lookup, the instance is still valid
+                pass
+        return instance
+
+    def _add(self, entries: OrderedDict | WeakValueDictionary, key: Hashable, instance: Any) -> Any:
+        # another thread may have added an equal instance since the lookup, the first one stays canonical
+        with self._lock:
+            kept = entries.setdefault(key, instance)
+            if self.weak:
+                return kept
+            if kept is not instance:
+                entries.move_to_end(key)
+            elif len(entries) > self.maxsize:
+                entries.popitem(last=False)
+            return kept
+
+    def clear(self) -> None:
+        with self._lock:
+            self.instances.clear()
+            self.inputs.clear()
+            self.stats = InternStats()
+
+
+def _input_key(data: Any) -> Hashable | None:
+    # the types are part of the key because True == 1 == 1.0 have the same hash but can validate differently
+    if type(data) is not dict:
+        return None
+    key = (tuple(data.items()), tuple(map(type, data.values())))
+    try:
+        hash(key)
+    except TypeError:  # e.g. a dict or list value, the validated instance can still be found
+        return None
+    return key
+
+
+class InternedModel(DeepFrozenModel):
+    model_config = ConfigDict(frozen=True)
+
+    intern_maxsize: ClassVar[int] = 100_000
+    intern_weak: ClassVar[bool] = False
+    __intern_table__: ClassVar[InternTable]
+    __intern_keys__: ClassVar[list[tuple[str, str]]]  # (field name, key the value arrives under)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls.__intern_table__ = InternTable(cls.intern_maxsize, cls.intern_weak)
+        cls.__intern_keys__ = []
+        for name, field_info in cls.model_fields.items():
+            alias = field_info.validation_alias if isinstance(field_info.validation_alias, str) else field_info.alias
+            cls.__intern_keys__.append((name, alias or name))
+
+    def __init__(self, /, **data: Any) -> None:
+        token = _initializing.set(True)
+        try:
+            super().__init__(**data)
+        finally:
+            _initializing.reset(token)
+
+    # like BaseModel.__init__, so that pydantic does not route model_validate through __init__ - a custom
+    # __init__ validates again without the strict and context arguments of the call
+    __init__.__pydantic_base_init__ = True
+
+    @classmethod
+    def _uncoerced(cls, data: dict[str, Any], instance: BaseModel) -> bool:
+        # True if every field got its value with the exact type it arrived with, so strict mode accepts the input too
+        values = instance.__dict__
+        keys = cls.__intern_keys__
+        return len(data) == len(keys) and all(key in data and type(data[key]) is type(values[name]) for name, key in keys)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _intern(cls, data: Any, handler: ValidatorFunctionWrapHandler, info: ValidationInfo) -> Any:
+        if _initializing.get():
+            _initializing.set(False)  # only for this instance, its nested fields are interned
+            return handler(data)
+        if info.context is not None:
+            return handler(data)
+
+        table = cls.__intern_table__
+        input_key = _input_key(data)
+        if input_key is not None and (instance := table.get_input(input_key)) is not None:
+            table.stats.hits += 1
+            return instance
+
+        instance = handler(data)
+        try:
+            canonical = table.add((cls, *instance.__dict__.values()), instance)
+        except TypeError:  # a field value that cannot be hashed, the instance is not interned
+            table.stats.misses += 1
+            return instance
+        if canonical is instance:
+            table.stats.misses += 1
+        else:
+            table.stats.hits += 1
+        if input_key is not None and cls._uncoerced(data, instance):
+            table.add_input(input_key, canonical)
+        return canonical
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        # interned instances are mostly either identical or different, the cached hashes tell the latter apart
+        if type(other) is type(self):
+            try:
+                if hash(self) != hash(other):
+                    return False
+            except TypeError:  # a field value that cannot be hashed
+                pass
+        return super().__eq__(other)
+
+
+if __name__ == "__main__":
+    import random
+
+    from pydantic import ValidationError
+
+    print("--- Interned frozen models ---")
+
+    class MyTariff(InternedModel):
+        my_code: str
+        my_region: str
+        my_rate: int
+
+    class MyReading(BaseModel):
+        my_int: int
+        my_tariff: MyTariff
+
+    external_data = {"my_code": "E7", "my_region": "north", "my_rate": 12}
+    my_tariff = MyTariff.model_validate(external_data)
+    print(my_tariff is MyTariff.model_validate(dict(external_data)))  # True, same raw input
+    print(my_tariff is MyTariff.model_validate({**external_data, "my_rate": "12"}))  # True, equal once validated
+    print(MyReading(my_int=1, my_tariff=external_data).my_tariff is my_tariff)  # True, nested field
+    print(MyTariff(**external_data) is my_tariff)  # False, __init__ creates a new instance
+    print(MyTariff.__intern_table__.stats)  # InternStats(hits=3, misses=1)
+    try:
+        MyTariff.model_validate({**external_data, "my_rate": "12"}, strict=True)
+    except ValidationError as e:
+        print(e.errors()[0]["type"])  # int_type, the lax input was not remembered
+
+    print("\n--- Benchmark: 1000 readings of 20 distinct tariffs ---")
+
+    class MyPlainTariff(BaseModel):
+        model_config = ConfigDict(frozen=True)
+
+        my_code: str
+        my_region: str
+        my_rate: int
+
+    class MyPlainReading(BaseModel):
+        my_int: int
+        my_tariff: MyPlainTariff
+
+    tariffs = [{"my_code": f"T{i}", "my_region": f"region {i % 5}", "my_rate": i} for i in range(20)]
+    readings = [{"my_int": i, "my_tariff": dict(random.choice(tariffs))} for i in range(1_000)]
+    MyTariff.__intern_table__.clear()
+    plain_readings = [MyPlainReading.model_validate(reading) for reading in readings]
+    interned_readings = [MyReading.model_validate(reading) for reading in readings]
+    pairs = list(zip(range(999), range(1, 1_000)))
+
+    print_header()
+    print_results([
+        measure("validate, frozen BaseModel", MyPlainReading.model_validate, readings),
+        measure("validate, InternedModel", MyReading.model_validate, readings),
+        measure(
+            "tariff ==, frozen BaseModel",
+            lambda pair: plain_readings[pair[0]].my_tariff == plain_readings[pair[1]].my_tariff,
+            pairs,
+        ),
+        measure(
+            "tariff ==, InternedModel",
+            lambda pair: interned_readings[pair[0]].my_tariff == interned_readings[pair[1]].my_tariff,
+            pairs,
+        ),
+    ])
+    print(f"hit rate {MyTariff.__intern_table__.stats.hit_rate:.1%}")
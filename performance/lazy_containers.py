@@ -0,0 +1,262 @@
+import json
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Iterator
+
+from pydantic import BaseModel, RootModel, TypeAdapter, ValidationError, model_serializer
+from pydantic_core import to_json
+
+# RootModel[list[int]] and RootModel[dict[str, int]] in models/root_model.py validate every element up front,
+# even when the consumer reads a few of them. LazyListModel and LazyDictModel keep the raw container and
+# validate an element the first time it is read, the validated element is cached:
+#
+#     class MyModels(LazyListModel):
+#         item_type = MyModel
+#
+#     my_models = MyModels.model_validate_json(big_json_array)  # only checks that it is a list
+#     my_models[3]  # validates element 3
+#     my_models.validate_all()  # validates the rest, e.g. before passing it on
+#
+# An invalid element raises its ValidationError when it is read, with the index or key in the location.
+# The strict and context arguments of model_validate apply to the elements validated later, too.
+# model_validate_json remembers that the input was JSON: an element read later is written back to JSON and
+# validated with validate_json, so strict mode and JSON-only conversions (an ISO string for a datetime in
+# strict mode, for one) work as they do with RootModel[list[MyModel]].model_validate_json. Writing the
+# elements back costs time: when every element ends up being read, the eager RootModel is faster.
+# The keys of a LazyDictModel are validated as key_type up front, only the values are lazy.
+# model_dump() and model_dump_json() validate all elements first. Equality compares the raw containers.
+
+_MISSING = object()
+_NO_VALIDATION_KWARGS: dict[str, Any] = {}
+
+
+@lru_cache(maxsize=None)
+def _adapter(item_type: Any) -> TypeAdapter:
+    return TypeAdapter(item_type)
+
+
+def _relocated(error: ValidationError, locate: Callable[[tuple], tuple]) -> ValidationError:
+    # the elements were validated on their own, locate turns the location of each error into the container's
+    errors = []
+    for details in error.errors():
+        init_details = {"type": details["type"], "loc": locate(details["loc"]), "input": details["input"]}
+        if "ctx" in details:
+            init_details["ctx"] = details["ctx"]
+        errors.append(init_details)
+    try:
+        return ValidationError.from_exception_data(error.title, errors)
+    except (KeyError, TypeError):  # a custom error type, which from_exception_data cannot rebuild
+        return error
+
+
+class _LazyContainer:
+    # shared by LazyListModel and LazyDictModel, both keep the validated elements in the _cache slot
+    # (a private attribute would take part in __eq__), the fully validated container in _all and the
+    # strict and context arguments of model_validate - and whether the input was JSON - in _validation,
+    # for the elements validated later.
+    # The slots are set on first use: model_copy(), deepcopy and pickle only copy the raw container,
+    # so a copy starts with nothing validated. Copies keep _validation, unpickled models validate with the defaults
+    item_type: ClassVar[Any] = Any
+
+    def _reset(self) -> dict[Any, Any]:
+        cache = {}
+        object.__setattr__(self, "_cache", cache)
+        object.__setattr__(self, "_all", None)
+        return cache
+
+    def _validate(self, validated_type: Any, value: Any) -> Any:
+        validation = getattr(self, "_validation", _NO_VALIDATION_KWARGS)
+        if validation.get("json"):
+            # the raw elements are the Python values of the JSON input, written back they are the same JSON
+            return _adapter(validated_type).validate_json(
+                to_json(value), strict=validation["strict"], context=validation["context"]
+            )
+        return _adapter(validated_type).validate_python(value, **validation)
+
+    def _item(self, key: Any) -> Any:
+        try:
+            if self._all is not None:
+                return self._all[key]
+            cache = self._cache
+        except AttributeError:
+            cache = self._reset()
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            try:
+                value = self._validate(self.item_type, self.root[key])
+            except ValidationError as e:
+                raise _relocated(e, lambda loc: (key, *loc)) from None
+            cache[key] = value
+        return value
+
+    def validate_all(self) -> Any:
+        """Validate every element that was not read yet and return the validated container.
+
+        The elements that were already read are reused, so they stay the same objects.
+        """
+        all_items = getattr(self, "_all", None)
+        if all_items is None:
+            all_items = self._validate_unread(getattr(self, "_cache", None) or {})
+            object.__setattr__(self, "_all", all_items)
+            object.__setattr__(self, "_cache", {})
+        return all_items
+
+    @classmethod
+    def model_validate(
+        cls, obj: Any, *, strict: bool | None = None, from_attributes: bool | None = None, context: Any = None
+    ) -> Any:
+        instance = super().model_validate(obj, strict=strict, from_attributes=from_attributes, context=context)
+        if instance is not obj and (strict is not None or context is not None):
+            object.__setattr__(instance, "_validation", {"strict": strict, "context": context})
+        return instance
+
+    @classmethod
+    def model_validate_json(
+        cls, json_data: str | bytes | bytearray, *, strict: bool | None = None, context: Any = None
+    ) -> Any:
+        # the elements stay the plain Python values of the JSON until they are read
+        instance = cls._validate_json_root(json_data, strict=strict, context=context)
+        object.__setattr__(instance, "_validation", {"strict": strict, "context": context, "json": True})
+        return instance
+
+    def __copy__(self) -> Any:
+        copied = super().__copy__()
+        if hasattr(self, "_validation"):
+            object.__setattr__(copied, "_validation", self._validation)
+        return copied
+
+    def __deepcopy__(self, memo: dict[int, Any] | None = None) -> Any:
+        copied = super().__deepcopy__(memo)
+        if hasattr(self, "_validation"):
+            object.__setattr__(copied, "_validation", self._validation)
+        return copied
+
+    @model_serializer(mode="plain")
+    def _serialize(self) -> Any:
+        return self.validate_all()
+
+    def __len__(self) -> int:
+        return len(self.root)
+
+
+class LazyListModel(_LazyContainer, RootModel[list]):
+    __slots__ = ("_cache", "_all", "_validation")
+
+    @classmethod
+    def _validate_json_root(cls, json_data: str | bytes | bytearray, **kwargs: Any) -> Any:
+        # json.loads builds the same values faster than pydantic's JSON validation of a list of Any,
+        # and checking that they are a list is the same in Python and JSON mode
+        try:
+            data = json.loads(json_data)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValidationError.from_exception_data(
+                cls.__name__, [{"type": "json_invalid", "loc": (), "input": json_data, "ctx": {"error": str(e)}}]
+            ) from None
+        return cls.model_validate(data, **kwargs)
+
+    def _validate_unread(self, cache: dict[int, Any]) -> list[Any]:
+        if not cache:
+            return self._validate(list[self.item_type], self.root)
+        unread = [index for index in range(len(self.root)) if index not in cache]
+        try:
+            values = iter(self._validate(list[self.item_type], [self.root[index] for index in unread]))
+        except ValidationError as e:
+            raise _relocated(e, lambda loc: (unread[loc[0]], *loc[1:])) from None
+        return [cache[index] if index in cache else next(values) for index in range(len(self.root))]
+
+    def __getitem__(self, item: int | slice) -> Any:
+        if isinstance(item, slice):
+            return [self._item(index) for index in range(*item.indices(len(self.root)))]
+        if item < 0:
+            item += len(self.root)
+        return self._item(item)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (self._item(index) for index in range(len(self.root)))
+
+
+class LazyDictModel(_LazyContainer, RootModel[dict]):
+    # the keys are validated as key_type when the model is built, so there is one key space: reading,
+    # iterating and the validated container all use the validated keys
+    __slots__ = ("_cache", "_all", "_validation")
+
+    key_type: ClassVar[Any] = str
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # runs before pydantic collects the fields, so the root is validated as a dict[key_type, Any]
+        cls.__annotations__ = {**cls.__dict__.get("__annotations__", {}), "root": dict[cls.key_type, Any]}
+
+    @classmethod
+    def _validate_json_root(cls, json_data: str | bytes | bytearray, **kwargs: Any) -> Any:
+        # JSON keys are strings, which only JSON mode validates like the JSON input (e.g. "1" for int in strict mode)
+        return cls.__pydantic_validator__.validate_json(json_data, **kwargs)
+
+    def _validate_unread(self, cache: dict[Any, Any]) -> dict[Any, Any]:
+        if not cache:
+            return self._validate(dict[Any, self.item_type], self.root)
+        unread = {key: value for key, value in self.root.items() if key not in cache}
+        values = self._validate(dict[Any, self.item_type], unread)
+        return {key: cache[key] if key in cache else values[key] for key in self.root}
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._item(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.root)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.root
+
+    def keys(self) -> Any:
+        return self.root.keys()
+
+    def values(self) -> Iterator[Any]:
+        return (self._item(key) for key in self.root)
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        return ((key, self._item(key)) for key in self.root)
+
+if __name__ == "__main__":
+    import pprint
+    import timeit
+
+    print("--- Lazy RootModel containers ---")
+
+    class MyNumbers(LazyListModel):
+        item_type = int
+
+    my_numbers = MyNumbers([1, "2", "hello"])
+    print(my_numbers[1])  # 2 - validated on access
+    try:
+        my_numbers[2]
+    except ValidationError as e:
+        pprint.pp(e.errors())  # Input should be a valid integer, loc (2,)
+
+    class MyMapping(LazyDictModel):
+        item_type = int
+
+    my_mapping = MyMapping({"a": 1, "b": "2", "c": 3})
+    print(my_mapping["b"], "c" in my_mapping, dict(my_mapping.items()))  # 2 True {'a': 1, 'b': 2, 'c': 3}
+    print(my_mapping.model_dump_json())  # {"a":1,"b":2,"c":3}
+
+    print("\n--- Benchmark: 100_000 models, 10 of them read ---")
+
+    class MyModel(BaseModel):
+        my_int: int
+        my_str: str
+
+    class MyModels(LazyListModel):
+        item_type = MyModel
+
+    MyEagerModels = RootModel[list[MyModel]]
+    json_data = json.dumps([{"my_int": i, "my_str": str(i)} for i in range(100_000)])
+
+    def read_ten(models: Any) -> list[Any]:
+        return [models[index] for index in range(0, 100_000, 10_000)]
+
+    def ms(func: Any) -> float:
+        return min(timeit.repeat(func, number=3, repeat=3)) / 3 * 1_000
+
+    print(f"RootModel[list[MyModel]]          {ms(lambda: read_ten(MyEagerModels.model_validate_json(json_data).root)):8.1f} ms")
+    print(f"LazyListModel                     {ms(lambda: read_ten(MyModels.model_validate_json(json_data))):8.1f} ms")
+    print(f"LazyListModel, then validate_all  {ms(lambda: MyModels.model_validate_json(json_data).validate_all()):8.1f} ms")
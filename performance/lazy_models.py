@@ -0,0 +1,160 @@
+import ast
+import contextlib
+import os
+import sys
+import time
+import warnings
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+import pydantic
+from pydantic import BaseModel, ConfigDict
+from pydantic._internal import _model_construction
+
+# config.py defines about fifteen MyModel variants at import time and every class statement builds
+# a core schema, a validator and a serializer right away - even for models a process never uses.
+# With defer_build=True the class statement only collects the fields and the build happens on the first
+# validate/dump. set_lazy_builds() turns that on project-wide, for every BaseModel subclass defined after
+# the call, so it belongs at the top of the entry point, before the models are imported:
+#
+#     set_lazy_builds()
+#     from config import MyModel  # built on the first MyModel(...) / model_dump()
+#
+# It sets defer_build on BaseModel's own model_config, which every model inherits. LazyModel is the same
+# for a single hierarchy, as a base model to opt in without the global switch.
+#
+# profile_model_builds() records how long each model takes to build, and where - at import time or at
+# first use - so the slow ones (e.g. alias_generator=to_camel models) can be found. Deferred models are
+# listed at import with 0 ms and get their build time and the location of their first use once they are
+# built, so the cost moved out of import time still shows up. It times pydantic's internal
+# complete_model_class, which does the actual build in both cases, and tells the two apart by whether a
+# class statement (ModelMetaclass.__new__) is running.
+
+
+class LazyModel(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+
+def set_lazy_builds(enabled: bool = True) -> None:
+    """Defer the build of every model defined from now on to its first validate/dump, or stop doing so."""
+    if enabled:
+        BaseModel.model_config["defer_build"] = True
+    else:
+        BaseModel.model_config.pop("defer_build", None)
+
+
+@dataclass
+class ModelBuild:
+    model: str
+    seconds: float
+    phase: str  # "import" when built by the class statement, "deferred" until first use, then "first use"
+    location: str  # file:line of the class statement or of the first use
+    config: list[str]
+
+
+PYDANTIC_DIR = os.path.dirname(pydantic.__file__)
+
+
+def _caller_location() -> str:
+    frame = sys._getframe(2)
+    while frame and (frame.f_code.co_filename.startswith(PYDANTIC_DIR) or frame.f_code.co_filename == __file__):
+        frame = frame.f_back
+    return f"{os.path.relpath(frame.f_code.co_filename)}:{frame.f_lineno}" if frame else "?"
+
+
+@contextlib.contextmanager
+def profile_model_builds() -> Iterator[list[ModelBuild]]:
+    builds: list[ModelBuild] = []
+    deferred: dict[type[BaseModel], ModelBuild] = {}
+    class_statements = 0
+    complete_model_class = _model_construction.complete_model_class
+    metaclass_new = _model_construction.ModelMetaclass.__dict__["__new__"]
+
+    def counted_new(mcs: type, *args: Any, **kwargs: Any) -> type:
+        nonlocal class_statements
+        class_statements += 1
+        try:
+            return metaclass_new.__func__(mcs, *args, **kwargs)
+        finally:
+            class_statements -= 1
+
+    def timed_complete_model_class(cls: type[BaseModel], cls_name: str, config_wrapper: Any, **kwargs: Any) -> bool:
+        config = sorted(key for key in cls.model_config if key != "defer_build")
+        if config_wrapper.defer_build:  # nothing is built yet, the build is timed at first use
+            deferred[cls] = ModelBuild(cls.__qualname__, 0.0, "deferred", _caller_location(), config)
+            builds.append(deferred[cls])
+            return complete_model_class(cls, cls_name, config_wrapper, **kwargs)
+        phase = "import" if class_statements else "first use"
+        location = _caller_location()
+        start = time.perf_counter()
+        try:
+            return complete_model_class(cls, cls_name, config_wrapper, **kwargs)
+        finally:
+            build = deferred.pop(cls, None)
+            if build is None:  # built by its class statement, or deferred before profiling started
+                build = ModelBuild(cls.__qualname__, 0.0, phase, location, config)
+                builds.append(build)
+            build.seconds, build.phase, build.location = time.perf_counter() - start, phase, location
+
+    _model_construction.complete_model_class = timed_complete_model_class
+    _model_construction.ModelMetaclass.__new__ = staticmethod(counted_new)
+    try:
+        yield builds
+    finally:
+        _model_construction.complete_model_class = complete_model_class
+        _model_construction.ModelMetaclass.__new__ = metaclass_new
+
+
+def print_builds(builds: list[ModelBuild], top: int = 10) -> None:
+    for build in sorted(builds, key=lambda build: build.seconds, reverse=True)[:top]:
+        print(
+            f"{build.seconds * 1_000:>8.2f} ms  {build.phase:<9}  {build.model:<12} {build.location:<22} "
+            f"{', '.join(build.config)}"
+        )
+    by_phase = {phase: sum(build.seconds for build in builds if build.phase == phase) for phase in ("import", "first use")}
+    pending = sum(build.phase == "deferred" for build in builds)
+    print(
+        f"total: {by_phase['import'] * 1_000:.1f} ms at import, {by_phase['first use'] * 1_000:.1f} ms at first use, "
+        f"{pending} deferred models not built yet"
+    )
+
+
+def class_definitions_only(path: Path) -> Any:
+    # the imports and class statements of a module, as if it only defined the models and used none of them
+    tree = ast.parse(path.read_text())
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.ClassDef))]
+    return compile(tree, str(path), "exec")
+
+
+@contextlib.contextmanager
+def lazy_builds() -> Iterator[None]:
+    # set_lazy_builds() for the duration of the block, the demo below compares both modes in one process
+    set_lazy_builds()
+    try:
+        yield
+    finally:
+        set_lazy_builds(False)
+
+
+if __name__ == "__main__":
+    config_py = Path(__file__).resolve().parent.parent / "config.py"
+    definitions = class_definitions_only(config_py)
+    exec(definitions, {"__name__": "config"})  # warm up pydantic's own imports
+
+    print("--- config.py models defined, none used: BaseModel ---")
+    with profile_model_builds() as builds:
+        exec(definitions, {"__name__": "config"})
+    print_builds(builds)
+
+    print("\n--- config.py models defined, none used: set_lazy_builds() ---")
+    with lazy_builds(), profile_model_builds() as builds:
+        exec(definitions, {"__name__": "config"})
+    print_builds(builds)
+
+    print("\n--- config.py run in full: set_lazy_builds() ---")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with lazy_builds(), profile_model_builds() as builds:
+            exec(compile(config_py.read_text(), str(config_py), "exec"), {"__name__": "config"})
+    print_builds(builds)
@@ -0,0 +1,215 @@
+import mmap
+import os
+import re
+from typing import Any, Callable, Iterator, Literal
+
+from pydantic import BaseModel, ValidationError
+
+# validation/1_validation_methods.py validates JSON from a string that is already in memory. For a multi-gigabyte
+# file, reading it and validating it as a list[MyModel] keeps the whole file plus every model in memory at once.
+# iter_json_file yields one validated model per record, so memory stays flat:
+#
+#     for my_model in iter_json_file("my_models.json", MyModel, format="array"):  # or format="ndjson"
+#         ...
+#
+# This is a memory saving, not a speedup. NDJSON is read with a plain buffered line loop, which is as fast as
+# validating the lines yourself. A JSON array file is memory-mapped and its records are found by a regex over
+# the mapping that matches strings, brackets and commas, splitting the elements at commas on the top level.
+# That scan runs a Python loop step per string and bracket, which makes it about 1.4x slower than reading the
+# file and validating it as a list[MyModel] - use it when the file does not fit in memory, and prefer NDJSON.
+# Each array record is sliced out of the mapping as bytes (model_validate_json does not take a memoryview)
+# and never decoded into a str, pydantic-core parses the bytes directly.
+# Anything but whitespace after the closing "]" is json_invalid, as it is for model_validate_json - raised once
+# the elements before it are yielded, like a missing "]", as the reader does not look ahead. The format
+# is given, not guessed: NDJSON lines can be arrays too, so the first byte does not tell the formats apart.
+# An invalid record raises its ValidationError, unless on_error is given: it is then called with the byte
+# offset of the record and the error, and reading continues with the next record.
+
+_TOKENS = re.compile(rb'("[^"\\]*(?:\\.[^"\\]*)*")|([\[{])|([\]}])|(,)')
+_STRING, _OPEN, _CLOSE, _COMMA = 1, 2, 3, 4
+_WHITESPACE = re.compile(rb"\s*")
+
+OnError = Callable[[int, ValidationError], None]
+
+
+def _map(path: str) -> mmap.mmap | None:
+    # an empty file cannot be mapped
+    if os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _validate(model: type[BaseModel], record: bytes, offset: int, on_error: OnError | None, **kwargs: Any) -> Any:
+    try:
+        return model.model_validate_json(record, **kwargs)
+    except ValidationError as e:
+        if on_error is None:
+            raise
+        on_error(offset, e)
+        return None
+
+
+def _json_invalid(model: type[BaseModel], path: str, error: str) -> ValidationError:
+    return ValidationError.from_exception_data(
+        model.__name__, [{"type": "json_invalid", "loc": (), "input": path, "ctx": {"error": error}}]
+    )
+
+
+def iter_ndjson(path: str, model: type[BaseModel], *, on_error: OnError | None = None, **kwargs: Any) -> Iterator[Any]:
+    """Yield a validated model for every non-empty line of an NDJSON file."""
+    validate_json = model.model_validate_json
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if not line.isspace():
+                try:
+                    my_model = validate_json(line, **kwargs)
+                except ValidationError as e:
+                    if on_error is None:
+                        raise
+                    on_error(offset, e)
+                else:
+                    yield my_model
+            offset += len(line)
+
+
+def _array_records(mm: mmap.mmap, start: int) -> Iterator[tuple[int, bytes] | str]:
+    # (byte offset, bytes) of every element of the array whose "[" is at start, an error if the data is not one array
+    start += 1
+    depth, count = 1, 0
+    for match in _TOKENS.finditer(mm, start):
+        kind = match.lastindex
+        if kind == _OPEN:
+            depth += 1
+        elif kind == _CLOSE:
+            depth -= 1
+            if depth == 0:
+                record = mm[start:match.start()]
+                if count or record.strip():  # "[]" has no elements, "[1,]" has an empty last one
+                    yield start, record
+                end = _WHITESPACE.match(mm, match.end()).end()
+                if end < len(mm):
+                    yield f"trailing characters at byte {end}"
+                return
+        elif kind == _COMMA and depth == 1:
+            yield start, mm[start:match.start()]
+            start = match.end()
+            count += 1
+    yield "EOF while parsing a list"
+
+
+def iter_json_array(
+    path: str, model: type[BaseModel], *, on_error: OnError | None = None, **kwargs: Any
+) -> Iterator[Any]:
+    """Yield a validated model for every element of a memory-mapped file holding one JSON array."""
+    mm = _map(path)
+    if mm is None:
+        raise _json_invalid(model, path, "EOF while parsing a value")
+    with mm:
+        start = _WHITESPACE.match(mm).end()
+        if mm[start:start + 1] != b"[":
+            raise _json_invalid(model, path, f"expected a JSON array at byte {start}")
+        records = _array_records(mm, start)
+        try:
+            for item in records:
+                if isinstance(item, str):
+                    raise _json_invalid(model, path, item)
+                my_model = _validate(model, item[1], item[0], on_error, **kwargs)
+                if my_model is not None:
+                    yield my_model
+        finally:
+            # the regex scanner holds a buffer export on the mapping, which has to go before the mapping is closed
+            records.close()
+
+
+def iter_json_file(
+    path: str,
+    model: type[BaseModel],
+    *,
+    format: Literal["array", "ndjson"],
+    on_error: OnError | None = None,
+    **kwargs: Any,
+) -> Iterator[Any]:
+    """Yield validated models from a file holding one JSON array (format="array") or NDJSON (format="ndjson")."""
+    if format == "array":
+        return iter_json_array(path, model, on_error=on_error, **kwargs)
+    if format == "ndjson":
+        return iter_ndjson(path, model, on_error=on_error, **kwargs)
+    raise ValueError(f"format must be 'array' or 'ndjson', got {format!r}")
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+    import tracemalloc
+
+    from pydantic import TypeAdapter
+
+    class MyModel(BaseModel):
+        my_int: int
+        my_str: str
+
+    class TopModel(BaseModel):
+        my_model: MyModel
+        my_tags: list[str]
+
+    print("--- Memory-mapped JSON reader ---")
+    with tempfile.NamedTemporaryFile("wb", suffix=".json", delete=False) as f:
+        f.write(b'[{"my_model": {"my_int": 1, "my_str": "a, [b]"}, "my_tags": ["}"]},\n')
+        f.write(b' {"my_model": {"my_int": "x", "my_str": "c"}, "my_tags": []},\n')
+        f.write(b' {"my_model": {"my_int": 3, "my_str": "d\\"e"}, "my_tags": []}]\n')
+        small_path = f.name
+
+    errors = {}
+    for my_model in iter_json_file(small_path, TopModel, format="array", on_error=errors.__setitem__):
+        print(my_model)  # my_model=MyModel(my_int=1, my_str='a, [b]') my_tags=['}'], then my_int=3
+    print({offset: e.errors()[0]["loc"] for offset, e in errors.items()})  # {67: ('my_model', 'my_int')}
+    try:
+        list(iter_json_file(small_path, TopModel, format="array"))
+    except ValidationError as e:
+        print(e.errors()[0]["type"])  # int_parsing
+    with open(small_path, "ab") as f:
+        f.write(b'{"my_model": {"my_int": 4, "my_str": "f"}, "my_tags": []}\n')
+    try:
+        list(iter_json_file(small_path, TopModel, format="array", on_error=errors.__setitem__))
+    except ValidationError as e:
+        print(e.errors()[0]["ctx"])  # {'error': 'trailing characters at byte 193'}
+    os.remove(small_path)
+
+    print("\n--- Benchmark: 500_000 records ---")
+    record = b'{"my_model": {"my_int": %d, "my_str": "bar"}, "my_tags": ["a", "b"]}'
+    with tempfile.NamedTemporaryFile("wb", suffix=".json", delete=False) as f:
+        f.write(b"[" + b",\n".join(record % i for i in range(500_000)) + b"]")
+        array_path = f.name
+    with tempfile.NamedTemporaryFile("wb", suffix=".ndjson", delete=False) as f:
+        f.write(b"\n".join(record % i for i in range(500_000)))
+        ndjson_path = f.name
+    print(f"file size {os.path.getsize(array_path) / 1e6:.1f} MB")
+
+    def read_list() -> int:
+        with open(array_path, "rb") as f:
+            return len(TypeAdapter(list[TopModel]).validate_json(f.read()))
+
+    def read_lines() -> int:
+        with open(ndjson_path, "rb") as f:
+            return sum(1 for line in f if TopModel.model_validate_json(line))
+
+    cases = {
+        "read() + list[TopModel] validate_json": read_list,
+        "iter_json_array": lambda: sum(1 for _ in iter_json_array(array_path, TopModel)),
+        "for line in file: model_validate_json": read_lines,
+        "iter_ndjson": lambda: sum(1 for _ in iter_ndjson(ndjson_path, TopModel)),
+    }
+    print(f"{'case':<44} {'seconds':>10} {'peak MB':>10}")
+    for name, func in cases.items():
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<44} {seconds:>10.2f} {peak / 1e6:>10.1f}")
+    os.remove(array_path)
+    os.remove(ndjson_path)
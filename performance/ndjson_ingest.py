@@ -0,0 +1,161 @@
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from pydantic import BaseModel
+from pydantic_core import ErrorDetails
+
+from batch_validation import batch_validate_lines
+
+# Validating a multi-gigabyte NDJSON file on one core is slow, so the file is split into
+# byte ranges that end on a newline and every range is validated in a separate process.
+# Each worker reads only its own range and validates its lines with batch_validate_lines - a single
+# core call per chunk, in which every line is parsed as a JSON document of its own. Records cannot shift
+# between lines: a malformed line, or one like '{...}, {...}' that is not exactly one JSON value, is a
+# json_invalid error of that line only, so every bad line gets its own errors keyed by its byte offset
+# and the good lines are still returned.
+# Sending the validated models back to the parent means pickling them, which for small records
+# costs more than the validation itself. When the models are only needed to compute something
+# (counts, aggregates, rows to write), pass a process function - it runs inside the worker and
+# only its return value crosses the process boundary.
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+@dataclass
+class ChunkResult:
+    start: int  # byte range of the chunk in the file
+    end: int
+    valid: list[BaseModel] = field(default_factory=list)  # empty when a process function is used
+    errors: dict[int, list[ErrorDetails]] = field(default_factory=dict)  # byte offset of the line -> errors
+    valid_count: int = 0
+    output: Any = None  # return value of the process function
+
+
+def chunk_ranges(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> list[tuple[int, int]]:
+    """Split a file into byte ranges of roughly chunk_size that end right after a newline."""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()  # move on to the end of the current line
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def validate_chunk(
+    model: type[BaseModel],
+    path: str,
+    start: int,
+    end: int,
+    process: Callable[[list[BaseModel]], Any] | None = None,
+) -> ChunkResult:
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    lines, offsets = [], []
+    offset = start
+    for line in data.split(b"\n"):
+        if line.strip():
+            lines.append(line)
+            offsets.append(offset)
+        offset += len(line) + 1
+
+    result = batch_validate_lines(model, lines)
+    valid = result.valid
+    errors = {offsets[index]: details for index, details in result.errors.items()}
+    if process is not None:
+        return ChunkResult(start, end, errors=errors, valid_count=len(valid), output=process(valid))
+    return ChunkResult(start, end, valid=valid, errors=errors, valid_count=len(valid))
+
+
+def ingest_ndjson(
+    path: str,
+    model: type[BaseModel],
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+    process: Callable[[list[BaseModel]], Any] | None = None,
+) -> Iterator[ChunkResult]:
+    """Validate an NDJSON file in a process pool and stream the results back chunk by chunk.
+
+    With ordered=False chunks are yielded as soon as they are done instead of in file order.
+    process must be picklable (a module level function) as it is sent to the workers.
+    At most two chunks per worker are in flight, so a slow consumer does not pile up results.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = iter(chunk_ranges(path, chunk_size))
+    max_in_flight = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next(in_flight) -> None:
+            for start, end in ranges:
+                in_flight.append(executor.submit(validate_chunk, model, path, start, end, process))
+                if len(in_flight) >= max_in_flight:
+                    return
+
+        if ordered:
+            queue: deque[Future] = deque()
+            submit_next(queue)
+            while queue:
+                result = queue.popleft().result()
+                submit_next(queue)
+                yield result
+        else:
+            pending: list[Future] = []
+            submit_next(pending)
+            while pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                pending = list(not_done)
+                submit_next(pending)
+                for future in done:
+                    yield future.result()
+
+
+# defined at module level so worker processes can unpickle the results
+class MyModel(BaseModel):
+    my_int: int
+    my_str: str
+
+class TopModel(BaseModel):
+    my_model: MyModel
+
+
+def sum_my_int(models: list[TopModel]) -> int:
+    return sum(model.my_model.my_int for model in models)
+
+
+if __name__ == "__main__":
+
+    print("--- NDJSON ingestion ---")
+    with tempfile.NamedTemporaryFile("wb", suffix=".ndjson", delete=False) as f:
+        for i in range(200_000):
+            my_int = b'"abs"' if i % 50_000 == 0 else b"%d" % i
+            f.write(b'{"my_model": {"my_int": %s, "my_str": "bar"}}\n' % my_int)
+        path = f.name
+
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        for process in (None, sum_my_int):
+            start = time.perf_counter()
+            valid = errors = 0
+            for chunk in ingest_ndjson(path, TopModel, workers=workers, chunk_size=1024 * 1024, process=process):
+                valid += chunk.valid_count
+                errors += len(chunk.errors)
+            print(
+                f"workers={workers} process={process and process.__name__}: "
+                f"{valid} valid, {errors} invalid in {time.perf_counter() - start:.2f}s"
+            )
+
+    chunk = next(ingest_ndjson(path, TopModel, workers=2, chunk_size=1024 * 1024))
+    print(chunk.errors)  # {0: [{'type': 'int_parsing', 'loc': ('my_model', 'my_int'), ...}]}
+    os.remove(path)
@@ -0,0 +1,158 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Annotated, Any, Iterator
+
+from pydantic import AfterValidator, ValidationInfo
+from pydantic_core import PydanticKnownError
+
+# PastDatetime in validation/2_types.py reads the clock, and works out the local UTC offset, for every value it
+# validates - for a batch of a million timestamps that is a million clock reads, and a timestamp close to "now"
+# can pass early in the batch and fail later in it. The Pinned* types compare against one snapshot of the clock
+# taken for the whole validation call or batch:
+#
+#     class MyModel(BaseModel):
+#         my_date: PinnedPastDatetime
+#
+#     with pinned_now():  # or pinned_now(datetime(2025, 6, 28, tzinfo=timezone.utc)) in tests
+#         my_models = TypeAdapter(list[MyModel]).validate_python(records)
+#
+# or for a single call, MyModel.model_validate(data, context={"now": some_datetime}) - the context wins over
+# pinned_now(). Without either, every value reads the clock, like PastDatetime.
+# Like PastDatetime, aware values are compared with the current instant and naive values with the local wall
+# clock time, both come from the same snapshot. Dates are compared with the local date of the snapshot.
+# The errors are pydantic's own datetime_past, datetime_future, date_past and date_future.
+# Comparing an aware value is fastest when it is in UTC with the same tzinfo as the snapshot, other tzinfos
+# make every comparison call utcoffset().
+# pinned_now() uses a ContextVar, so it applies to the current thread or asyncio task only.
+
+
+@dataclass(frozen=True, slots=True)
+class ClockSnapshot:
+    aware: datetime  # the instant, timezone aware
+    naive: datetime  # local wall clock time
+    today: date  # local date
+
+
+def clock_snapshot(now: datetime | None = None) -> ClockSnapshot:
+    """A snapshot of now, or of the given time - a naive datetime is taken as local time."""
+    aware = datetime.now(timezone.utc) if now is None else now.astimezone(timezone.utc)
+    naive = aware.astimezone().replace(tzinfo=None)
+    return ClockSnapshot(aware, naive, naive.date())
+
+
+_pinned: ContextVar[ClockSnapshot | None] = ContextVar("pinned_now", default=None)
+_last_context_snapshot: tuple[Any, ClockSnapshot | None] = (None, None)
+
+
+@contextmanager
+def pinned_now(now: datetime | None = None) -> Iterator[ClockSnapshot]:
+    """Validate every Pinned* value inside the block against one snapshot of the clock."""
+    token = _pinned.set(clock_snapshot(now))
+    try:
+        yield _pinned.get()
+    finally:
+        _pinned.reset(token)
+
+
+def _snapshot(info: ValidationInfo) -> ClockSnapshot | None:
+    global _last_context_snapshot
+    if info.context is not None and "now" in info.context:
+        # the same context is passed to every value of the call, so its snapshot is kept for the next value
+        now = info.context["now"]
+        last_now, snapshot = _last_context_snapshot
+        if now is not last_now:
+            snapshot = clock_snapshot(now)
+            _last_context_snapshot = (now, snapshot)
+        return snapshot
+    return _pinned.get()
+
+
+def _past_datetime(value: datetime, info: ValidationInfo) -> datetime:
+    snapshot = _snapshot(info)
+    if snapshot is None:
+        now = datetime.now() if value.tzinfo is None else datetime.now(timezone.utc)
+    else:
+        now = snapshot.naive if value.tzinfo is None else snapshot.aware
+    if value < now:
+        return value
+    raise PydanticKnownError("datetime_past")
+
+
+def _future_datetime(value: datetime, info: ValidationInfo) -> datetime:
+    snapshot = _snapshot(info)
+    if snapshot is None:
+        now = datetime.now() if value.tzinfo is None else datetime.now(timezone.utc)
+    else:
+        now = snapshot.naive if value.tzinfo is None else snapshot.aware
+    if value > now:
+        return value
+    raise PydanticKnownError("datetime_future")
+
+
+def _past_date(value: date, info: ValidationInfo) -> date:
+    snapshot = _snapshot(info)
+    if value < (date.today() if snapshot is None else snapshot.today):
+        return value
+    raise PydanticKnownError("date_past")
+
+
+def _future_date(value: date, info: ValidationInfo) -> date:
+    snapshot = _snapshot(info)
+    if value > (date.today() if snapshot is None else snapshot.today):
+        return value
+    raise PydanticKnownError("date_future")
+
+
+PinnedPastDatetime = Annotated[datetime, AfterValidator(_past_datetime)]
+PinnedFutureDatetime = Annotated[datetime, AfterValidator(_future_datetime)]
+PinnedPastDate = Annotated[date, AfterValidator(_past_date)]
+PinnedFutureDate = Annotated[date, AfterValidator(_future_date)]
+
+
+if __name__ == "__main__":
+    import pprint
+    import timeit
+    from datetime import timedelta
+
+    from pydantic import BaseModel, PastDatetime, TypeAdapter, ValidationError
+
+    print("--- Pinned clock for Past/Future types ---")
+
+    class MyModel(BaseModel):
+        my_date: PinnedPastDatetime
+        my_deadline: PinnedFutureDate
+
+    noon = datetime(2025, 6, 28, 12, 0, tzinfo=timezone.utc)
+    data = {"my_date": "2025-06-28T11:59:59Z", "my_deadline": "2025-07-01"}
+    print(MyModel.model_validate(data, context={"now": noon}))  # my_date=datetime(2025, 6, 28, 11, 59, 59, tzinfo=...) ...
+    with pinned_now(noon):
+        print(MyModel(**data).my_deadline)  # 2025-07-01
+    try:
+        MyModel.model_validate({**data, "my_date": "2025-06-28T12:00:01Z"}, context={"now": noon})
+    except ValidationError as e:
+        pprint.pp(e.errors())  # Input should be in the past
+    print(MyModel.model_validate({"my_date": datetime(2025, 6, 28), "my_deadline": date(2099, 1, 1)}))  # naive, local time
+
+    print("\n--- Benchmark: 1_000_000 timestamps ---")
+    timestamps = [datetime(2020, 1, 1) + timedelta(seconds=i) for i in range(1_000_000)]
+    aware_timestamps = [timestamp.replace(tzinfo=timezone.utc) for timestamp in timestamps]
+    past = TypeAdapter(list[PastDatetime])
+    pinned_past = TypeAdapter(list[PinnedPastDatetime])
+
+    def ms(func: Any) -> float:
+        return min(timeit.repeat(func, number=1, repeat=3)) * 1_000
+
+    def with_pinned_now(timestamps: list[datetime]) -> Any:
+        with pinned_now():
+            return pinned_past.validate_python(timestamps)
+
+    print(f"{'case':<44} {'naive, ms':>10} {'aware, ms':>10}")
+    for name, func in (
+        ("PastDatetime", past.validate_python),
+        ("PinnedPastDatetime, not pinned", pinned_past.validate_python),
+        ("PinnedPastDatetime, pinned_now()", with_pinned_now),
+        ("PinnedPastDatetime, context={'now': ...}", lambda values: pinned_past.validate_python(values, context={"now": noon})),
+    ):
+        print(f"{name:<44} {ms(lambda: func(timestamps)):>10.1f} {ms(lambda: func(aware_timestamps)):>10.1f}")
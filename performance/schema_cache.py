@@ -0,0 +1,393 @@
+import dataclasses
+import hashlib
+import io
+import os
+import pickle
+import re
+import stat
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from inspect import signature
+from pathlib import Path
+from typing import Any, get_args, get_origin
+
+import pydantic
+from pydantic import BaseModel, ConfigDict
+from pydantic_core import CoreConfig, CoreSchema, SchemaSerializer, SchemaValidator
+
+from core_schemas import NAMED_SCHEMA_KEYS, SCHEMA_KEYS, model_core_config
+
+# Every class statement of a BaseModel generates a core schema and compiles a validator and serializer.
+# Generating the core schema is Python work and dominates the cost of a class definition,
+# while compiling the validator from a finished core schema is fast.
+# CachedSchemaModel stores each model's core schema on disk and later processes rebuild the
+# validator and serializer from it, skipping schema generation.
+#
+#     class MyModel(CachedSchemaModel):
+#         my_int: int
+#
+# The cache key is a hash of the Python and pydantic versions, the qualified name of the model, how many
+# models with that name the module defined before it (the workshop modules redefine MyModel many times),
+# and the definition of the model and of every model used in its fields: the resolved annotations, the
+# FieldInfo of every field, model_config and the validator and serializer decorators. Functions and classes
+# in those count by their qualified name plus the contents of the source file of their module, as do the
+# files the models and their bases come from. A custom type can pull in code the definition does not show -
+# its __get_pydantic_core_schema__ may call validators from a third module - so each entry also records the
+# hash of the source file of every function and class its generated core schema references, and an entry
+# whose files changed since is rebuilt. Standard library files are covered by the Python version instead.
+#
+# Only models whose core schema can be pickled are cached - lambdas, e.g. default_factory=lambda: ...,
+# cannot be pickled, so those models are built as usual. The cached schema has its "metadata" removed
+# (it holds JSON schema helpers that cannot be pickled), which validation and serialization do not use.
+# A model loaded from the cache generates its real schema the first time something needs the JSON schema
+# helpers: model_json_schema(), or a model that is not cached using it as a field. Its signature is set
+# like pydantic sets it, so a cached model looks the same from the outside as a built one.
+# pydantic has no public API to hand a model a finished schema, so _install_schema sets the class attributes
+# model_rebuild would set and _rebuild calls model_rebuild with its private namespace argument. Both are kept
+# together below, the only places this module depends on pydantic internals.
+#
+# Loading a pickle runs code, so the cache lives in a per-user directory (~/.cache/pydantic_schema_cache, or
+# PYDANTIC_SCHEMA_CACHE) created with mode 0o700, and an entry is only loaded - or written - if the entry and
+# its directory belong to the current user and cannot be written by anyone else.
+
+SCHEMA_CACHE_DIR = Path(
+    os.environ.get("PYDANTIC_SCHEMA_CACHE")
+    or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pydantic_schema_cache"
+)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    uncacheable: int = 0
+
+
+stats = CacheStats()
+_definitions: Counter = Counter()  # (module, qualname) -> number of models defined with that name so far
+
+
+STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+MEMORY_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+@lru_cache(maxsize=None)
+def _file_hash(path: str) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _module_file(value: Any) -> str | None:
+    # the source file of the module a function or class comes from, None for pydantic and the standard library
+    module_name = getattr(value, "__module__", None)
+    path = getattr(sys.modules.get(module_name), "__file__", None) if isinstance(module_name, str) else None
+    if not path or module_name.split(".")[0] in ("pydantic", "pydantic_core") or path.startswith(STDLIB_DIR):
+        return None
+    return path
+
+
+def _models(cls: type[BaseModel], seen: dict[type, None] | None = None) -> list[type[BaseModel]]:
+    # the model and every model used in its fields, at any depth, in a stable order
+    seen = seen if seen is not None else {}
+    if cls in seen:
+        return list(seen)
+    seen[cls] = None
+    types = [field.annotation for field in cls.model_fields.values()]
+    while types:
+        annotation = types.pop()
+        types.extend(get_args(annotation))
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            _models(annotation, seen)
+    return list(seen)
+
+
+def _source_files(models: list[type[BaseModel]]) -> set[str]:
+    # the files of the models' modules and of their bases
+    return {path for cls in models for klass in cls.__mro__ if (path := _module_file(klass))}
+
+
+def _fingerprint(value: Any, files: set[str]) -> str:
+    # like repr, but the same in every process: functions and classes by name, not by address. The source
+    # files of the functions and classes found are added to files, their contents go into the key too.
+    fingerprint = partial(_fingerprint, files=files)
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}({', '.join(map(fingerprint, value))})"
+    if isinstance(value, (set, frozenset)):
+        return f"{type(value).__name__}({', '.join(sorted(map(fingerprint, value)))})"
+    if isinstance(value, dict):
+        return f"{{{', '.join(f'{fingerprint(key)}: {fingerprint(item)}' for key, item in value.items())}}}"
+    if get_origin(value) is not None:
+        return f"{fingerprint(get_origin(value))}[{', '.join(map(fingerprint, get_args(value)))}]"
+    if isinstance(value, type) or (callable(value) and hasattr(value, "__qualname__")):
+        if path := _module_file(value):
+            files.add(path)
+        return f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+    if isinstance(value, partial):
+        return f"partial({fingerprint(value.func)}, {fingerprint(value.args)}, {fingerprint(value.keywords)})"
+    if dataclasses.is_dataclass(value):
+        fields = {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+        return f"{fingerprint(type(value))}({fingerprint(fields)})"
+    if hasattr(value, "__repr_args__"):  # FieldInfo and other pydantic objects
+        return f"{fingerprint(type(value))}({fingerprint(dict(value.__repr_args__()))})"
+    if hasattr(value, "__dict__"):  # e.g. an AfterValidator-like marker, whose default repr has its address
+        return f"{fingerprint(type(value))}({fingerprint(vars(value))})"
+    return MEMORY_ADDRESS.sub("", repr(value))
+
+
+def _definition(cls: type[BaseModel], files: set[str]) -> str:
+    decorators = {
+        kind.name: {
+            name: (decorator.func, decorator.info)
+            for name, decorator in getattr(cls.__pydantic_decorators__, kind.name).items()
+        }
+        for kind in dataclasses.fields(cls.__pydantic_decorators__)
+    }
+    return _fingerprint(
+        [
+            cls,
+            {name: (field.annotation, field) for name, field in cls.model_fields.items()},
+            cls.model_config,
+            decorators,
+        ],
+        files,
+    )
+
+
+def schema_cache_key(cls: type[BaseModel], occurrence: int) -> str:
+    key = hashlib.sha256()
+    key.update(f"{sys.version}:{pydantic.VERSION}:{cls.__module__}:{cls.__qualname__}:{occurrence}".encode())
+    models = _models(cls)
+    files = _source_files(models)
+    for model in models:
+        key.update(_definition(model, files).encode())
+    for path in sorted(files):
+        key.update(_file_hash(path).encode())
+    return key.hexdigest()
+
+
+def _schema_files(schema: CoreSchema) -> dict[str, str]:
+    # the hash of the source file of every function and class the generated schema references
+    files: set[str] = set()
+    _fingerprint(schema, files)
+    return {path: _file_hash(path) for path in files}
+
+
+def _files_unchanged(files: dict[str, str]) -> bool:
+    try:
+        return all(_file_hash(path) == digest for path, digest in files.items())
+    except OSError:
+        return False
+
+
+def _strip_metadata(schema: Any) -> Any:
+    # removes the "metadata" of every schema node, never a field or tag that happens to be called metadata.
+    # A metadata key left in a node type missing from SCHEMA_KEYS makes the schema unpicklable, so the model
+    # is just not cached.
+    if isinstance(schema, (list, tuple)):
+        return type(schema)(_strip_metadata(value) for value in schema)
+    if not isinstance(schema, dict):
+        return schema
+    stripped = {}
+    for key, value in schema.items():
+        if key == "metadata":
+            continue
+        if key in NAMED_SCHEMA_KEYS and isinstance(value, dict):
+            value = {name: _strip_metadata(node) for name, node in value.items()}
+        elif key in SCHEMA_KEYS:
+            value = _strip_metadata(value)
+        stripped[key] = value
+    return stripped
+
+
+class _SchemaPickler(pickle.Pickler):
+    # the model itself is not importable yet - the class statement has not finished - so it is
+    # stored as a placeholder and swapped back in when the schema is loaded
+    def __init__(self, file: io.BytesIO, cls: type):
+        super().__init__(file)
+        self.cls = cls
+
+    def persistent_id(self, obj: Any) -> str | None:
+        return "cls" if obj is self.cls else None
+
+
+class _SchemaUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, cls: type):
+        super().__init__(file)
+        self.cls = cls
+
+    def persistent_load(self, pid: str) -> type:
+        return self.cls
+
+
+def _trusted(path: Path) -> bool:
+    # owned by the current user and not writable by group or others, on systems with file ownership
+    if not hasattr(os, "getuid"):
+        return True
+    try:
+        status = path.stat()
+    except OSError:
+        return False
+    return status.st_uid == os.getuid() and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _load(cls: type[BaseModel], path: Path) -> bool:
+    if not (_trusted(path.parent) and _trusted(path)):
+        return False
+    try:
+        schema, core_config, model_signature, files = _SchemaUnpickler(io.BytesIO(path.read_bytes()), cls).load()
+    except Exception:  # a stale or unreadable entry is rebuilt
+        return False
+    if not _files_unchanged(files):
+        return False  # code the schema calls was edited since the entry was written
+    _install_schema(cls, schema, core_config, model_signature)
+    return True
+
+
+def restore_schema(cls: type[BaseModel]) -> None:
+    """Replace the cached schema of a model, which has no JSON schema helpers, with a generated one."""
+    if cls.__dict__.get("__schema_from_cache__"):
+        cls.__schema_from_cache__ = False
+        _rebuild(cls)
+
+
+### pydantic internals: the attributes a model build sets, and the namespace model_rebuild resolves from
+
+
+def _install_schema(
+    cls: type[BaseModel], schema: CoreSchema, core_config: CoreConfig | None, model_signature: Any
+) -> None:
+    cls.__pydantic_core_schema__ = schema
+    cls.__pydantic_validator__ = SchemaValidator(schema, core_config)
+    cls.__pydantic_serializer__ = SchemaSerializer(schema, core_config)
+    cls.__pydantic_complete__ = True
+    cls.__signature__ = model_signature
+    cls.__schema_from_cache__ = True
+
+
+def _rebuild(cls: type[BaseModel]) -> None:
+    # the model's own module namespace, not that of whoever called restore_schema
+    cls.model_rebuild(force=True, _parent_namespace_depth=0)
+
+
+def _save(cls: type[BaseModel], path: Path, schema: CoreSchema) -> bool:
+    entry = (_strip_metadata(schema), model_core_config(schema), signature(cls), _schema_files(schema))
+    buffer = io.BytesIO()
+    try:
+        _SchemaPickler(buffer, cls).dump(entry)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not _trusted(path.parent):
+            return False
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(buffer.getvalue())
+        temporary.replace(path)  # atomic, so a concurrent process never reads half an entry
+    except OSError:  # e.g. a cache directory that cannot be created, the model is then just not cached
+        return False
+    return True
+
+
+def load_or_build(cls: type[BaseModel]) -> None:
+    _definitions[cls.__module__, cls.__qualname__] += 1
+    path = SCHEMA_CACHE_DIR / f"{schema_cache_key(cls, _definitions[cls.__module__, cls.__qualname__])}.pickle"
+    if path.exists() and _load(cls, path):
+        stats.hits += 1
+        return
+
+    # defer_build skipped the build when the class was created, do it now
+    if not cls.model_rebuild(force=True, raise_errors=False):
+        return  # e.g. a forward reference that is not defined yet, pydantic builds it on first use
+    if _save(cls, path, cls.__pydantic_core_schema__):
+        stats.misses += 1
+    else:
+        stats.uncacheable += 1
+
+
+class CachedSchemaModel(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        load_or_build(cls)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: type[BaseModel], handler: Any) -> CoreSchema:
+        # a model that uses this one as a field gets the real schema, or its JSON schema would lose ours
+        restore_schema(cls)
+        return super().__get_pydantic_core_schema__(source, handler)
+
+    @classmethod
+    def model_json_schema(cls, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        restore_schema(cls)
+        return super().model_json_schema(*args, **kwargs)
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_module(module: str, cached: bool) -> None:
+    # runs a workshop module with its output hidden and prints how long it took
+    import contextlib
+    import runpy
+    import warnings
+
+    if cached:
+        pydantic.BaseModel = CachedSchemaModel  # every `from pydantic import BaseModel` now opts in
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        runpy.run_path(str(ROOT / module))
+    print(time.perf_counter() - start, stats.hits, stats.misses, stats.uncacheable)
+
+
+def time_module(module: str, mode: str, cache_dir: str) -> tuple[float, int, int, int] | None:
+    command = [sys.executable, __file__, "--run", module, mode]
+    env = {**os.environ, "PYDANTIC_SCHEMA_CACHE": cache_dir}
+    completed = subprocess.run(command, capture_output=True, text=True, env=env, cwd=ROOT)
+    if completed.returncode != 0:
+        return None
+    elapsed, hits, misses, uncacheable = completed.stdout.split()
+    return float(elapsed), int(hits), int(misses), int(uncacheable)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run_module(sys.argv[2], cached=sys.argv[3] == "cached")
+        raise SystemExit
+
+    WORKSHOP_MODULES = [
+        "models.py",
+        "fields.py",
+        "config.py",
+        "parsing_strict_mode.py",
+        "models/root_model.py",
+        *sorted(str(path.relative_to(ROOT)) for path in (ROOT / "validation").iterdir() if path.is_file()),
+        *sorted(str(path.relative_to(ROOT)) for path in (ROOT / "serialisation").glob("*.py")),
+    ]
+
+    print("--- Startup time of the workshop modules ---")
+    print(f"{'module':<48} {'plain ms':>9} {'cold ms':>9} {'warm ms':>9} {'hits':>5} {'uncacheable':>12}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        totals = [0.0, 0.0, 0.0]
+        for module in WORKSHOP_MODULES:
+            plain = time_module(module, "plain", cache_dir)
+            cold = time_module(module, "cached", cache_dir)  # fills the cache
+            warm = time_module(module, "cached", cache_dir)  # a later process, reads the cache
+            if plain is None or cold is None or warm is None:
+                print(f"{module:<48} failed to run")
+                continue
+            for index, result in enumerate((plain, cold, warm)):
+                totals[index] += result[0]
+            print(
+                f"{module:<48} {plain[0] * 1_000:>9.1f} {cold[0] * 1_000:>9.1f} {warm[0] * 1_000:>9.1f} "
+                f"{warm[1]:>5} {warm[3]:>12}"
+            )
+        print(f"{'total':<48} {totals[0] * 1_000:>9.1f} {totals[1] * 1_000:>9.1f} {totals[2] * 1_000:>9.1f}")
@@ -0,0 +1,301 @@
+import pprint
+import time
+import timeit
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache, partial
+from typing import Any, Generic, Literal, Sequence, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic_core import ErrorDetails
+
+from batch_validation import batch_validate, partial_list_adapter
+from benchmark import measure, print_header, print_results
+
+# model_construct creates a model without validation, with no safety net at all.
+# For feeds we produce ourselves, TrustedConstructor skips validation for most records and
+# fully validates a sample of them: every N-th record, or as many records as fit in a time budget.
+# Sampled records that fail validation are counted per field, so drift in a trusted feed shows up
+# in the metrics instead of silently flowing downstream. What happens to the failed record itself is
+# set with on_failure: "raise" its ValidationError (the default), "drop" it (None is returned) or
+# "pass" it on unvalidated, built like the records that were not sampled.
+#
+#     trusted = TrustedConstructor(MyModel, sample_every=100)
+#     models = trusted.construct_many(records)  # or trusted(record) one by one
+#
+# model_construct itself is not fast: it resolves aliases and defaults in Python for every field,
+# and for a small model it is slower than model_validate. fast_construct fills the instance directly
+# when the record has exactly the model's field names, and falls back to model_construct otherwise.
+# That still costs about a microsecond per record in Python, so skipping validation only pays off when
+# model_validate costs more: for MyModel below (an int and a str) trusted(record) is about a third slower
+# than model_validate, for MyWideModel (constraints, a validator, datetime and list) it is about 2x faster.
+# Small models with cheap validation are better off with plain model_validate.
+# construct_many takes whole batches: it picks the sampled records once per batch and validates them in one
+# core call. With validate_when_cheaper=True it also measures both ways of building a batch - the first batch
+# is validated in full to get the cost of validation - and validates every later batch in full whenever that
+# is the cheaper one, as it is for MyModel. Without it no record outside the sample is ever validated.
+# Models with private attributes or a model_post_init always go through model_construct, which sets them up.
+# Note: neither builds nested models, TopModel.model_construct(my_model={...}) keeps my_model as a dict,
+# so the trusted path suits flat models with expensive validation (constraints, validators) best.
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_object_new = object.__new__
+_object_setattr = object.__setattr__
+
+
+@lru_cache(maxsize=None)
+def _field_names(model: type[BaseModel]) -> tuple[str, ...] | None:
+    # models that keep extra keys, have private attributes or a model_post_init always go through model_construct
+    if model.model_config.get("extra") == "allow" or model.__private_attributes__ or model.__pydantic_post_init__:
+        return None
+    return tuple(model.model_fields)
+
+
+def _construct(model: type[ModelT], field_names: tuple[str, ...] | None, data: dict[str, Any]) -> ModelT:
+    if field_names is None:
+        return model.model_construct(**data)
+    try:
+        values = {name: data[name] for name in field_names}
+    except KeyError:  # a missing field or an alias - left to model_construct
+        return model.model_construct(**data)
+    instance = _object_new(model)
+    _object_setattr(instance, "__dict__", values)
+    _object_setattr(instance, "__pydantic_fields_set__", set(values))
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+def fast_construct(model: type[ModelT], data: dict[str, Any]) -> ModelT:
+    """Create a model without validation, like model_construct but without per-field Python work."""
+    return _construct(model, _field_names(model), data)
+
+
+@dataclass
+class DriftMetrics:
+    constructed: int = 0  # records built without validation
+    sampled: int = 0  # records fully validated
+    failed: int = 0  # sampled records that did not pass validation
+    validation_seconds: float = 0.0
+    field_failures: Counter = field(default_factory=Counter)  # loc of the failing field -> count
+    last_errors: deque = field(default_factory=lambda: deque(maxlen=10))
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failed / self.sampled if self.sampled else 0.0
+
+    def record_failure(self, errors: list[ErrorDetails]) -> None:
+        self.failed += 1
+        self.field_failures.update(".".join(map(str, details["loc"])) for details in errors)
+        self.last_errors.append(errors)
+
+
+class TrustedConstructor(Generic[ModelT]):
+    """Build models without validation, fully validating a sample of them.
+
+    sample_every=100 validates every 100th record.
+    time_budget=0.05 validates records as long as validation takes at most 5% of the elapsed time.
+    validate_when_cheaper=True lets construct_many validate whole batches when that costs less than building them.
+    For small models with cheap validation trusted(record) is slower than model_validate.
+    """
+
+    def __init__(
+        self,
+        model: type[ModelT],
+        *,
+        sample_every: int | None = None,
+        time_budget: float | None = None,
+        on_failure: Literal["raise", "drop", "pass"] = "raise",
+        validate_when_cheaper: bool = False,
+    ):
+        if (sample_every is None) == (time_budget is None):
+            raise ValueError("Pass exactly one of sample_every and time_budget")
+        if on_failure not in ("raise", "drop", "pass"):
+            raise ValueError(f"on_failure must be 'raise', 'drop' or 'pass', got {on_failure!r}")
+        self.model = model
+        self.sample_every = sample_every
+        self.time_budget = time_budget
+        self.on_failure = on_failure
+        self.validate_when_cheaper = validate_when_cheaper
+        self.metrics = DriftMetrics()
+        self._construct = partial(_construct, model, _field_names(model))
+        partial_list_adapter(model)  # built up front, so the first batch does not time it
+        self._started = time.perf_counter()
+        self._count = 0
+        self._batch_validation_seconds = 0.0  # construct_many's cost per record of the two ways to build a batch
+        self._batch_validations = 0
+        self._construction_seconds = 0.0
+        self._constructions = 0
+
+    def _should_sample(self) -> bool:
+        self._count += 1
+        if self.sample_every is not None:
+            return self._count % self.sample_every == 0
+        elapsed = time.perf_counter() - self._started
+        return self.metrics.validation_seconds <= self.time_budget * elapsed
+
+    def _sample_positions(self, size: int) -> range:
+        # the records of a batch that are validated, spread evenly over the batch
+        count, self._count = self._count, self._count + size
+        if self.sample_every is not None:
+            return range(self.sample_every - 1 - count % self.sample_every, size, self.sample_every)
+        credit = self.time_budget * (time.perf_counter() - self._started) - self.metrics.validation_seconds
+        if credit < 0:
+            return range(0)
+        if not self.metrics.sampled:
+            return range(min(size, 1))
+        affordable = max(1, int(credit / (self.metrics.validation_seconds / self.metrics.sampled)))
+        return range(0, size, -(-size // affordable))
+
+    def __call__(self, data: dict[str, Any]) -> ModelT | None:
+        if not self._should_sample():
+            self.metrics.constructed += 1
+            return self._construct(data)
+        return self._validate(data)
+
+    def construct_many(self, records: Sequence[dict[str, Any]]) -> list[ModelT]:
+        """Build a batch of models, choosing the validated records once for the whole batch.
+
+        The chosen records are validated together in one core call. With validate_when_cheaper the first batch
+        is validated in full, later batches are too whenever that has cost no more per record than building the
+        instances in Python. Dropped records are left out of the returned list.
+        """
+        if self.validate_when_cheaper and self._validation_is_cheaper():
+            self._count += len(records)
+            start = time.perf_counter()
+            models = self._validate_records(records)
+            self._batch_validation_seconds += time.perf_counter() - start
+            self._batch_validations += len(records)
+            return [model for model in models if model is not None]
+
+        positions = self._sample_positions(len(records))
+        validated = self._validate_records([records[position] for position in positions])
+        start = time.perf_counter()
+        models = list(map(self._construct, records))
+        self._construction_seconds += time.perf_counter() - start
+        self._constructions += len(records)
+        self.metrics.constructed += len(records) - len(positions)
+        for position, model in zip(positions, validated):
+            models[position] = model
+        if any(model is None for model in validated):
+            return [model for model in models if model is not None]
+        return models
+
+    def _validation_is_cheaper(self) -> bool:
+        if not self._batch_validations or not self._constructions:
+            return not self._batch_validations
+        validation = self._batch_validation_seconds / self._batch_validations
+        return validation <= self._construction_seconds / self._constructions
+
+    def _validate_records(self, records: Sequence[dict[str, Any]]) -> list[ModelT | None]:
+        # one model per record, None for a dropped record
+        if not records:
+            return []
+        self.metrics.sampled += len(records)
+        start = time.perf_counter()
+        result = batch_validate(self.model, records)
+        self.metrics.validation_seconds += time.perf_counter() - start
+        if not result.errors:
+            return result.valid
+
+        for errors in result.errors.values():
+            self.metrics.record_failure(errors)
+        if self.on_failure == "raise":
+            self.model.model_validate(records[min(result.errors)])  # raises the record's own ValidationError
+        models = dict(zip(result.valid_indices, result.valid))
+        if self.on_failure == "drop":
+            return [models.get(index) for index in range(len(records))]
+        self.metrics.constructed += len(result.errors)
+        return [models[index] if index in models else self._construct(data) for index, data in enumerate(records)]
+
+    def _validate(self, data: dict[str, Any]) -> ModelT | None:
+        self.metrics.sampled += 1
+        start = time.perf_counter()
+        try:
+            return self.model.model_validate(data)
+        except ValidationError as e:
+            self.metrics.record_failure(e.errors())
+            if self.on_failure == "raise":
+                raise
+            if self.on_failure == "drop":
+                return None
+            self.metrics.constructed += 1
+            return self._construct(data)
+        finally:
+            self.metrics.validation_seconds += time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+    print("--- Trusted construction with sampled validation ---")
+
+    class MyModel(BaseModel):
+        my_int: int
+        my_str: str
+
+    external_data = [{"my_int": i, "my_str": "bar"} for i in range(10_000)]
+    external_data[499] = {"my_int": "abs", "my_str": 123}  # drift in the trusted feed, the 500th record is sampled
+
+    trusted = TrustedConstructor(MyModel, sample_every=100, on_failure="drop")
+    models = [model for model in map(trusted, external_data) if model is not None]
+    print(len(models), trusted.metrics.sampled, trusted.metrics.failed)  # 9999 100 1
+    pprint.pp(trusted.metrics.field_failures)  # Counter({'my_int': 1, 'my_str': 1})
+
+    trusted = TrustedConstructor(MyModel, sample_every=100, on_failure="drop")
+    batches = [external_data[start:start + 1_000] for start in range(0, len(external_data), 1_000)]
+    models = [model for batch in batches for model in trusted.construct_many(batch)]
+    print(len(models), trusted.metrics.failed)  # 9999 1
+
+    trusted = TrustedConstructor(MyModel, time_budget=0.05, on_failure="pass")
+    models = [trusted(data) for data in external_data]
+    print(f"sampled {trusted.metrics.sampled} of {len(external_data)} records with a 5% time budget")
+
+    print("\n--- Benchmark ---")
+
+    class MyWideModel(BaseModel):
+        my_int: int = Field(gt=0)
+        my_str: str = Field(min_length=3)
+        my_decimal: Decimal = Field(decimal_places=2)
+        my_datetime: datetime
+        my_list: list[int]
+
+        @field_validator("my_str")
+        @classmethod
+        def validate_alphanumeric(cls, value: str) -> str:
+            if not value.isalnum():
+                raise ValueError("Must be alphanumeric")
+            return value
+
+    cases = [
+        (MyModel, [{"my_int": i, "my_str": "bar"} for i in range(1, 1_001)]),
+        (MyWideModel, [
+            {"my_int": i, "my_str": "bar", "my_decimal": "12.34", "my_datetime": "2024-01-01T00:00:00", "my_list": [1, 2]}
+            for i in range(1, 1_001)
+        ]),
+    ]
+    print_header()
+    for model, payloads in cases:
+        print_results([
+            measure(f"{model.__name__} model_validate", model.model_validate, payloads),
+            measure(f"{model.__name__} model_construct", lambda data: model.model_construct(**data), payloads),
+            measure(f"{model.__name__} fast_construct", lambda data: fast_construct(model, data), payloads),
+            measure(f"{model.__name__} trusted sample_every=100", TrustedConstructor(model, sample_every=100), payloads),
+            measure(f"{model.__name__} trusted time_budget=0.05", TrustedConstructor(model, time_budget=0.05), payloads),
+        ])
+
+    print("\n--- Benchmark: batches of 1000 records ---")
+
+    def ms(func: Any) -> float:
+        return min(timeit.repeat(func, number=20, repeat=5)) / 20 * 1_000
+
+    print(f"{'case':<24} {'model_validate, ms':>20} {'construct_many, ms':>20} {'validate_when_cheaper, ms':>26}")
+    for model, payloads in cases:
+        trusted = TrustedConstructor(model, sample_every=100)
+        adaptive = TrustedConstructor(model, sample_every=100, validate_when_cheaper=True)
+        validate_ms = ms(lambda: [model.model_validate(data) for data in payloads])
+        construct_ms = ms(lambda: trusted.construct_many(payloads))
+        adaptive_ms = ms(lambda: adaptive.construct_many(payloads))
+        print(f"{model.__name__:<24} {validate_ms:>20.2f} {construct_ms:>20.2f} {adaptive_ms:>26.2f}")
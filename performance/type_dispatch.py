@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Annotated, Any
+
+from pydantic import BaseModel, GetCoreSchemaHandler, InstanceOf, TypeAdapter, ValidationError
+from pydantic_core import core_schema
+
+# DogCompetition.dogs: list[Dog] in validation/2_types.py checks the class of every element against Dog.
+# For a dataclass that check is cheap, but for a BaseModel subclass it goes through ABCMeta.__instancecheck__,
+# and for a union of classes pydantic-core tries the members one after the other - 10 to 20 times slower
+# per element. The outcome only depends on the class of the element, so DispatchList caches it per class:
+#
+#     class DogCompetition(BaseModel):
+#         dogs: DispatchList[Dog]  # list[Dog], or DispatchList[InstanceOf[Dog]], DispatchList[Dog | Cat]
+#
+# The first element of a class is validated as usual, and the outcome is remembered for the class:
+#   accept - pydantic passed the instance through unchanged, e.g. a Poodle for Dog
+#   reject - it failed with an error about the class itself, e.g. a Cat for Dog
+#   revalidate - anything else, e.g. a dict, or an instance of a model with revalidate_instances="always"
+# A list whose elements all have accepted classes is then copied, with one set lookup per element and no
+# call into pydantic-core. Lists with other elements get pydantic's own list validation, so the values and
+# errors are the same as with list[Dog]. For a single dataclass or InstanceOf the cache is no faster than
+# pydantic-core's own isinstance check, the win is for model subclasses and unions - see the benchmark.
+# Only item types whose validation depends on the class alone can be cached: models, dataclasses, InstanceOf
+# and unions or Optionals of them, without model validators. Anything else raises a TypeError.
+
+ACCEPT, REJECT, REVALIDATE = "accept", "reject", "revalidate"
+CLASS_ERRORS = {"model_type", "model_class_type", "dataclass_type", "dataclass_exact_type", "is_instance_of"}
+
+
+@lru_cache(maxsize=None)
+def _adapter(item_type: Any) -> TypeAdapter:
+    return TypeAdapter(item_type)
+
+
+def _class_determined(schema: core_schema.CoreSchema, definitions: dict[str, Any]) -> bool:
+    # True if whether an instance passes through unchanged depends only on its class
+    schema_type = schema["type"]
+    if schema_type == "definitions":
+        definitions = {**definitions, **{definition["ref"]: definition for definition in schema["definitions"]}}
+        return _class_determined(schema["schema"], definitions)
+    if schema_type == "definition-ref":
+        return _class_determined(definitions[schema["schema_ref"]], definitions)
+    if schema_type in ("model", "dataclass", "is-instance", "none"):
+        return True
+    if schema_type == "json-or-python":
+        return _class_determined(schema["python_schema"], definitions)
+    if schema_type in ("nullable", "default"):
+        return _class_determined(schema["schema"], definitions)
+    if schema_type == "union":
+        return all(_class_determined(choice[0] if isinstance(choice, tuple) else choice, definitions) for choice in schema["choices"])
+    return False
+
+
+class TypeDispatch:
+    """Annotated marker for list[item_type] that caches the accept/reject/revalidate outcome per element class."""
+
+    def __init__(self, item_type: Any):
+        self.item_type = item_type
+        self.decisions: dict[type, str] = {}
+        self.accepted: set[type] = set()
+
+    def decide(self, item: Any) -> str:
+        cls = type(item)
+        try:
+            decision = ACCEPT if _adapter(self.item_type).validate_python(item) is item else REVALIDATE
+        except ValidationError as e:
+            errors = e.errors()
+            decision = REJECT if all(error["type"] in CLASS_ERRORS and not error["loc"] for error in errors) else REVALIDATE
+        self.decisions[cls] = decision
+        if decision == ACCEPT:
+            self.accepted.add(cls)
+        return decision
+
+    def __get_pydantic_core_schema__(self, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        if not _class_determined(_adapter(self.item_type).core_schema, {}):
+            raise TypeError(f"DispatchList[{self.item_type!r}]: the validation of the items does not depend on the class alone")
+        accepted = self.accepted
+
+        def validate(value: Any, handler: core_schema.ValidatorFunctionWrapHandler) -> Any:
+            if type(value) is not list:
+                return handler(value)
+            if accepted.issuperset(map(type, value)):
+                return value.copy()
+            classes = set(map(type, value))
+            unknown = classes.difference(self.decisions)
+            for item in value:
+                if not unknown:
+                    break
+                if type(item) in unknown:
+                    unknown.discard(type(item))
+                    self.decide(item)
+            if accepted.issuperset(classes):
+                return value.copy()
+            return handler(value)
+
+        return core_schema.no_info_wrap_validator_function(validate, handler(source))
+
+
+class DispatchList:
+    """DispatchList[Dog] is list[Dog] with the validation outcome cached per element class."""
+
+    def __class_getitem__(cls, item_type: Any) -> Any:
+        return Annotated[list[item_type], TypeDispatch(item_type)]
+
+
+if __name__ == "__main__":
+    import pprint
+    import timeit
+    from typing import Union
+
+    print("--- Type-dispatch cache for list[Dog] ---")
+
+    @dataclass
+    class Dog:
+        name: str
+        owner: str
+
+    @dataclass
+    class Poodle(Dog):
+        ...
+
+    @dataclass
+    class Beagle(Dog):
+        ...
+
+    @dataclass
+    class Cat:
+        name: str
+        owner: str
+
+    class DogCompetition(BaseModel):
+        dogs: DispatchList[Dog]
+
+    print(DogCompetition(dogs=[Poodle("Lucy", "Karl"), Beagle("Gifty", "John"), {"name": "Rex", "owner": "Anna"}]))
+    # dogs=[Poodle(name='Lucy', owner='Karl'), Beagle(name='Gifty', owner='John'), Dog(name='Rex', owner='Anna')]
+    try:
+        DogCompetition(dogs=[Poodle("Lucy", "Karl"), Cat("Missy", "Betty")])
+    except ValidationError as e:
+        pprint.pp(e.errors())  # Input should be a dictionary or an instance of Dog, loc ('dogs', 1)
+    print(DogCompetition.model_fields["dogs"].metadata[0].decisions)  # {Poodle: 'accept', Beagle: 'accept', dict: ..., Cat: 'reject'}
+
+    class DogInstanceCompetition(BaseModel):
+        dogs: DispatchList[InstanceOf[Dog]]
+
+    print(DogInstanceCompetition(dogs=[Poodle("Lucy", "Karl")]))  # dogs=[Poodle(name='Lucy', owner='Karl')]
+
+    print("\n--- Benchmark: 1_000_000 elements ---")
+
+    class MyModel(BaseModel):
+        my_str: str
+
+    class MySubModel(MyModel):
+        ...
+
+    other_classes = [dataclass(type(f"MyClass{i}", (), {"__annotations__": {"name": str}})) for i in range(5)]
+    MyUnion = Union[tuple(other_classes) + (Dog,)]
+
+    cases = [
+        ("list[Dog] of Poodle", Dog, [Poodle(str(i), "Karl") for i in range(1_000_000)]),
+        ("list[InstanceOf[Dog]] of Poodle", InstanceOf[Dog], [Poodle(str(i), "Karl") for i in range(1_000_000)]),
+        ("list[Dog | Cat] of Poodle and Cat", Dog | Cat, [Poodle("Lucy", "Karl") if i % 2 else Cat("Missy", "Betty") for i in range(1_000_000)]),
+        ("list[<union of 6>] of Poodle", MyUnion, [Poodle(str(i), "Karl") for i in range(1_000_000)]),
+        ("list[MyModel] of MySubModel", MyModel, [MySubModel(my_str=str(i)) for i in range(1_000_000)]),
+    ]
+
+    def ms(func: Any) -> float:
+        return min(timeit.repeat(func, number=1, repeat=3)) * 1_000
+
+    print(f"{'case':<36} {'list[...], ms':>14} {'DispatchList, ms':>18}")
+    for name, item_type, items in cases:
+        plain = TypeAdapter(list[item_type])
+        dispatch = TypeAdapter(DispatchList[item_type])
+        dispatch.validate_python(items[:10])  # the classes are decided once, before measuring
+        print(f"{name:<36} {ms(lambda: plain.validate_python(items)):>14.1f} {ms(lambda: dispatch.validate_python(items)):>18.1f}")